@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Arrow IPC 流式日志写入工具（面向高频数值日志场景）。
+
+设计目标：
+1) 行数据先缓存在内存中，每累计 N 行或超过时间间隔后以一个 RecordBatch 追加写入，
+   避免逐行的浮点数→文本格式化开销。
+2) 输出为 Arrow IPC stream 格式（.arrows），分析端可直接 pyarrow.ipc.open_stream 读取。
+3) 接口与 ResilientCsvWriter 保持一致（ensure_open / write_row / flush / close）。
+
+pyarrow 为可选依赖，仅在选择 Arrow 输出格式时才需要安装。
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import time
+from typing import Any, Iterable, List, Optional, Sequence
+
+try:
+    import pyarrow as pa
+except ImportError:  # 仅在实际使用 Arrow 输出时报错
+    pa = None
+
+
+def _to_float(value: Any) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _to_bool(value: Any) -> Optional[bool]:
+    if value is None:
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    return bool(value)
+
+
+def _to_str(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    return value if isinstance(value, str) else str(value)
+
+
+class ArrowStreamLogWriter:
+    def __init__(
+        self,
+        path: str,
+        header: Sequence[str],
+        *,
+        string_columns: Iterable[str] = (),
+        bool_columns: Iterable[str] = (),
+        batch_rows: int = 20,
+        flush_interval_s: float = 5.0,
+        verbose: bool = False,
+        label: str = "arrow",
+    ) -> None:
+        if pa is None:
+            raise ImportError("Arrow 日志格式需要安装 pyarrow：pip install pyarrow")
+
+        self._path = path
+        self._header = list(header)
+        self._batch_rows = max(1, int(batch_rows))
+        self._flush_interval_s = max(0.0, float(flush_interval_s))
+        self._verbose = bool(verbose)
+        self._label = label
+
+        string_set = set(string_columns)
+        bool_set = set(bool_columns)
+        fields = []
+        converters = []
+        for name in self._header:
+            if name in string_set:
+                fields.append(pa.field(name, pa.string()))
+                converters.append(_to_str)
+            elif name in bool_set:
+                fields.append(pa.field(name, pa.bool_()))
+                converters.append(_to_bool)
+            else:
+                fields.append(pa.field(name, pa.float64()))
+                converters.append(_to_float)
+        self._schema = pa.schema(fields)
+        self._converters = converters
+
+        self._sink = None
+        self._writer = None
+        self._rows: List[Sequence[Any]] = []
+        self._last_flush_at: float = 0.0
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def ensure_open(self) -> bool:
+        if self._writer is not None:
+            return True
+        try:
+            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            self._sink = pa.OSFile(self._path, "wb")
+            self._writer = pa.ipc.new_stream(self._sink, self._schema)
+            self._last_flush_at = time.time()
+            return True
+        except (OSError, pa.ArrowException) as exc:
+            if self._verbose:
+                print(f"[{self._label}] Arrow open error on {self._path}: {exc}")
+            self._sink = None
+            self._writer = None
+            return False
+
+    def write_row(self, row: Sequence[Any]) -> bool:
+        if not self.ensure_open():
+            return False
+        self._rows.append(row)
+        now = time.time()
+        if len(self._rows) >= self._batch_rows or (
+            self._flush_interval_s > 0 and (now - self._last_flush_at) >= self._flush_interval_s
+        ):
+            self.flush()
+        return True
+
+    def flush(self) -> None:
+        if self._writer is None or not self._rows:
+            return
+        rows = self._rows
+        self._rows = []
+        try:
+            columns = [
+                pa.array([convert(row[idx]) for row in rows], type=field.type)
+                for idx, (field, convert) in enumerate(zip(self._schema, self._converters))
+            ]
+            self._writer.write_batch(pa.RecordBatch.from_arrays(columns, schema=self._schema))
+            self._sink.flush()
+        except (OSError, pa.ArrowException, TypeError, ValueError, OverflowError, IndexError) as exc:
+            # 转换或写入失败时丢弃这一批并报告行数，不向调用方抛出，后续批次照常写入
+            print(f"[{self._label}] Arrow write error on {self._path}, dropped {len(rows)} rows: {exc}")
+        self._last_flush_at = time.time()
+
+    def close(self) -> None:
+        if self._writer is None:
+            return
+        try:
+            self.flush()
+            self._writer.close()
+            self._sink.close()
+        except Exception:
+            pass
+        finally:
+            self._writer = None
+            self._sink = None
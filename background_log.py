@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+后台线程日志写入包装器（面向采样循环不能被磁盘 I/O 阻塞的场景）。
+
+设计目标：
+1) 采样线程只把行数据放入有界队列，文件写入由后台守护线程完成，磁盘抖动不会拖慢采样。
+2) 后台线程每次最多取出 batch_rows 行，一次性交给底层写入器。
+3) 队列满时丢弃新行并计数，而不是阻塞采样线程；丢弃和写入异常不受 verbose 控制，
+   第一次发生时立即报告，之后每累计 REPORT_EVERY 次报告一次，close 时总是报告丢弃总数。
+4) 接口与 ResilientCsvWriter / ArrowStreamLogWriter 保持一致（ensure_open / write_row / write_rows / flush / close），
+   底层写入器只在后台线程中使用。
+5) write_rows 传入的一组行、以及交给底层 write_lines 的已格式化行，各自作为一个队列元素整体入队，
+   后台线程一次写出。
+"""
+
+from __future__ import annotations
+
+import queue
+import threading
+from typing import Any, Iterable, List, Sequence
+
+# 队列中的控制指令
+_FLUSH = object()
+_STOP = object()
+
+# 丢弃行数/写入异常次数每累计这么多报告一次（第一次总是报告）
+REPORT_EVERY = 100
+
+
+class _Rows(tuple):
+    """队列元素：write_rows 传入的一组行"""
+
+
+class _Lines(tuple):
+    """队列元素：调用方已格式化好的一组行，交给底层写入器的 write_lines"""
+
+
+class BackgroundLogWriter:
+    def __init__(
+        self,
+        writer: Any,
+        *,
+        max_queue: int = 1024,
+        batch_rows: int = 32,
+        verbose: bool = False,
+        label: str = "log",
+    ) -> None:
+        self._writer = writer
+        self._batch_rows = max(1, int(batch_rows))
+        self._verbose = bool(verbose)
+        self._label = label
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._dropped = 0
+        self._write_errors = 0
+        self._closed = False
+
+        self._thread = threading.Thread(target=self._run, name=f"{label}-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def path(self) -> str:
+        return self._writer.path
+
+    @property
+    def dropped(self) -> int:
+        """队列满而被丢弃的行数"""
+        return self._dropped
+
+    def ensure_open(self) -> bool:
+        """在开始写入前调用，直接由调用线程打开底层文件。"""
+        return self._writer.ensure_open()
+
+    def write_row(self, row: Sequence[Any]) -> bool:
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait(row)
+            return True
+        except queue.Full:
+            self._count_dropped(1)
+            return False
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> int:
+        rows = _Rows(rows)
+        if self._closed or not rows:
+            return 0
+        try:
+            self._queue.put_nowait(rows)
+            return len(rows)
+        except queue.Full:
+            self._count_dropped(len(rows))
+            return 0
+
+    def write_lines(self, lines: Sequence[str]) -> int:
+        if self._closed or not lines:
+            return 0
+        try:
+            self._queue.put_nowait(_Lines(lines))
+            return len(lines)
+        except queue.Full:
+            self._count_dropped(len(lines))
+            return 0
+
+    def flush(self) -> None:
+        if self._closed:
+            return
+        try:
+            self._queue.put_nowait(_FLUSH)
+        except queue.Full:
+            pass
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        # 停止指令必须送达，必要时等待后台线程腾出队列空间；后台线程已退出时不再等待
+        while self._thread.is_alive():
+            try:
+                self._queue.put(_STOP, timeout=0.5)
+                break
+            except queue.Full:
+                continue
+        self._thread.join()
+        self._writer.close()
+        if self._dropped:
+            print(f"[{self._label}] Dropped {self._dropped} rows in total because the write queue was full")
+
+    def _count_dropped(self, count: int) -> None:
+        """累计丢弃行数；第一次丢弃及之后每跨过 REPORT_EVERY 行报告一次"""
+        before = self._dropped
+        self._dropped = before + count
+        if before == 0 or before // REPORT_EVERY != self._dropped // REPORT_EVERY:
+            print(f"[{self._label}] Write queue full, dropped {self._dropped} rows so far")
+
+    def _report_write_error(self, exc: Exception) -> None:
+        """后台写入异常；第一次及之后每 REPORT_EVERY 次报告一次"""
+        self._write_errors += 1
+        if self._write_errors == 1 or self._write_errors % REPORT_EVERY == 0:
+            print(f"[{self._label}] Background write error ({self._write_errors} so far): {exc}")
+
+    def _run(self) -> None:
+        get = self._queue.get
+        get_nowait = self._queue.get_nowait
+        while True:
+            item = get()
+            batch: List[Sequence[Any]] = []
+            # 尽量多取几行一起写入，遇到控制指令或整组已格式化的行时先写出已取出的行
+            while True:
+                if item is _FLUSH or item is _STOP or item.__class__ is _Lines or item.__class__ is _Rows:
+                    break
+                batch.append(item)
+                if len(batch) >= self._batch_rows:
+                    item = None
+                    break
+                try:
+                    item = get_nowait()
+                except queue.Empty:
+                    item = None
+                    break
+            if batch:
+                self._write_batch(batch)
+            if item.__class__ is _Rows:
+                self._write_batch(list(item))
+            elif item.__class__ is _Lines:
+                self._write_lines(item)
+            elif item is _FLUSH:
+                try:
+                    self._writer.flush()
+                except Exception as exc:
+                    self._report_write_error(exc)
+            elif item is _STOP:
+                return
+
+    def _write_batch(self, batch: List[Sequence[Any]]) -> None:
+        try:
+            write_rows = getattr(self._writer, "write_rows", None)
+            if write_rows is not None:
+                write_rows(batch)
+            else:
+                for row in batch:
+                    self._writer.write_row(row)
+        except Exception as exc:
+            # 后台线程不能因单次写入异常退出，否则后续数据全部积压在队列中
+            self._report_write_error(exc)
+
+    def _write_lines(self, lines: _Lines) -> None:
+        try:
+            self._writer.write_lines(lines)
+        except Exception as exc:
+            self._report_write_error(exc)
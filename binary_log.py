@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+定长二进制日志写入工具（面向高频数值日志场景）。
+
+设计目标：
+1) 每行按固定的小端 struct 布局追加写入（数值列 float64，布尔列 1 字节），
+   不做浮点数→文本格式化，也不在每行重复列名，文件只追加不回写。
+2) 列名、struct 格式等元数据只在打开文件时写一次，保存在同名 .json 描述文件中。
+3) 字符串列不进入定长记录，只在取值变化时以 JSON Lines 追加到 .strings.jsonl 旁路文件
+  （{"row": 行号, "列名": 新值}），读取时按行号向后填充即可还原。
+4) 接口与 ResilientCsvWriter 保持一致（ensure_open / write_row / write_rows / flush / close）。
+
+读取示例：
+    meta = json.load(open(path + ".json"))
+    dtype = numpy.dtype([tuple(field) for field in meta["numpy_dtype"]])
+    data = numpy.fromfile(path, dtype=dtype)
+"""
+
+from __future__ import annotations
+
+import json
+import math
+import os
+import struct
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+FORMAT_NAME = "udp-latency-binlog"
+FORMAT_VERSION = 1
+
+
+def _to_float(value: Any) -> float:
+    if value is None:
+        return math.nan
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _to_bool(value: Any) -> bool:
+    if isinstance(value, float) and math.isnan(value):
+        return False
+    return bool(value)
+
+
+class BinaryRecordLogWriter:
+    def __init__(
+        self,
+        path: str,
+        header: Sequence[str],
+        *,
+        string_columns: Iterable[str] = (),
+        bool_columns: Iterable[str] = (),
+        flush_every: int = 20,
+        verbose: bool = False,
+        label: str = "bin",
+    ) -> None:
+        self._path = path
+        self._header = list(header)
+        self._flush_every = max(1, int(flush_every))
+        self._verbose = bool(verbose)
+        self._label = label
+
+        string_set = set(string_columns)
+        bool_set = set(bool_columns)
+        codes = []
+        record_columns: List[str] = []
+        self._record_idx: List[int] = []
+        self._string_idx: List[int] = []
+        self._bool_slots: List[int] = []
+        for idx, name in enumerate(self._header):
+            if name in string_set:
+                self._string_idx.append(idx)
+                continue
+            if name in bool_set:
+                self._bool_slots.append(len(record_columns))
+                codes.append("?")
+            else:
+                codes.append("d")
+            record_columns.append(name)
+            self._record_idx.append(idx)
+        self._record_columns = record_columns
+        self._struct = struct.Struct("<" + "".join(codes))
+
+        self._meta_path = path + ".json"
+        self._strings_path = path + ".strings.jsonl"
+        self._fh = None
+        self._strings_fh = None
+        self._row_count = 0
+        self._pending = 0
+        self._last_strings: Dict[str, Any] = {}
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def record_size(self) -> int:
+        """每行定长记录的字节数"""
+        return self._struct.size
+
+    def _metadata(self) -> Dict[str, Any]:
+        return {
+            "format": FORMAT_NAME,
+            "version": FORMAT_VERSION,
+            "byte_order": "little",
+            "struct_format": self._struct.format,
+            "record_size": self._struct.size,
+            "columns": self._record_columns,
+            "numpy_dtype": [
+                [name, "?" if code == "?" else "<f8"]
+                for name, code in zip(self._record_columns, self._struct.format[1:])
+            ],
+            "string_columns": [self._header[idx] for idx in self._string_idx],
+            "strings_file": os.path.basename(self._strings_path),
+            "header": self._header,
+        }
+
+    def ensure_open(self) -> bool:
+        if self._fh is not None:
+            return True
+        try:
+            os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+            with open(self._meta_path, "w", encoding="utf-8") as meta:
+                json.dump(self._metadata(), meta, ensure_ascii=False, indent=2)
+            self._fh = open(self._path, "ab", buffering=1 << 16)
+            # 续写已有文件时行号从已有记录数开始，保证旁路文件中的行号连续
+            self._row_count = self._fh.tell() // self._struct.size
+            if self._string_idx:
+                self._strings_fh = open(self._strings_path, "a", encoding="utf-8", buffering=1 << 14)
+            self._last_strings = {}
+            return True
+        except OSError as exc:
+            if self._verbose:
+                print(f"[{self._label}] Binary log open error on {self._path}: {exc}")
+            self._close_handles()
+            return False
+
+    def _pack(self, row: Sequence[Any]) -> bytes:
+        values = [row[idx] for idx in self._record_idx]
+        try:
+            return self._struct.pack(*values)
+        except struct.error:
+            # 个别列类型不符（None、字符串等）时逐列转换后重试
+            values = [_to_float(value) for value in values]
+            for slot in self._bool_slots:
+                values[slot] = _to_bool(values[slot])
+            return self._struct.pack(*values)
+
+    def _changed_strings(self, row: Sequence[Any]) -> Optional[Dict[str, Any]]:
+        changed: Optional[Dict[str, Any]] = None
+        last = self._last_strings
+        for idx in self._string_idx:
+            name = self._header[idx]
+            value = row[idx]
+            if name in last and last[name] == value:
+                continue
+            last[name] = value
+            if changed is None:
+                changed = {"row": self._row_count}
+            changed[name] = value if value is None or isinstance(value, str) else str(value)
+        return changed
+
+    def write_row(self, row: Sequence[Any]) -> bool:
+        return self.write_rows((row,))
+
+    def write_rows(self, rows: Iterable[Sequence[Any]]) -> bool:
+        if not self.ensure_open():
+            return False
+        try:
+            for row in rows:
+                if self._strings_fh is not None:
+                    changed = self._changed_strings(row)
+                    if changed is not None:
+                        self._strings_fh.write(json.dumps(changed, ensure_ascii=False) + "\n")
+                self._fh.write(self._pack(row))
+                self._row_count += 1
+                self._pending += 1
+            if self._pending >= self._flush_every:
+                self.flush()
+            return True
+        except OSError as exc:
+            if self._verbose:
+                print(f"[{self._label}] Binary log write error on {self._path}: {exc}")
+            self._close_handles()
+            return False
+
+    def flush(self) -> None:
+        if self._fh is None:
+            return
+        try:
+            if self._strings_fh is not None:
+                self._strings_fh.flush()
+            self._fh.flush()
+        except OSError as exc:
+            if self._verbose:
+                print(f"[{self._label}] Binary log flush error on {self._path}: {exc}")
+        self._pending = 0
+
+    def _close_handles(self) -> None:
+        for fh in (self._fh, self._strings_fh):
+            if fh is None:
+                continue
+            try:
+                fh.close()
+            except Exception:
+                pass
+        self._fh = None
+        self._strings_fh = None
+
+    def close(self) -> None:
+        if self._fh is None:
+            return
+        self.flush()
+        self._close_handles()
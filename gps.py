@@ -4,70 +4,131 @@
 将GPS数据保存到文件中，集成到UDP通信测试系统
 """
 
+from __future__ import annotations
+
 import time
 import signal
 import sys
-import os
-import getopt
 import math
-from datetime import datetime
-from functools import partial
-from typing import Dict, Any, Optional, List
+import operator
+import threading
+from collections import namedtuple
+from pathlib import Path
+from functools import lru_cache, partial
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Dict, Any, Optional, List, Mapping, Sequence, Tuple
 
 from resilient_csv import ResilientCsvWriter
+from background_log import BackgroundLogWriter
 
-try:
+if TYPE_CHECKING:
+    # 仅供静态检查使用，运行时由 _load_ros_dependencies() 按需导入
     import rclpy
     from geometry_msgs.msg import Vector3Stamped, AccelStamped, TwistStamped, QuaternionStamped
     from sensor_msgs.msg import NavSatFix, MagneticField, Joy
     from std_msgs.msg import Float32, Bool, UInt8, UInt16
     from psdk_interfaces.msg import (
-        PositionFused,
-        GPSDetails,
-        RCConnectionStatus,
-        RelativeObstacleInfo,
-        EscData,
-        SingleBatteryInfo,
-        FlightStatus,
-        FlightAnomaly,
-        DisplayMode,
-        ControlMode,
-        HmsInfoTable,
-        RTKYaw,
+        PositionFused, GPSDetails, RCConnectionStatus, RelativeObstacleInfo, EscData, SingleBatteryInfo,
+        FlightStatus, FlightAnomaly, DisplayMode, ControlMode, HmsInfoTable, RTKYaw,
     )
-    from rclpy.qos import qos_profile_sensor_data
-
     from as2_python_api.drone_interface_gps import DroneInterfaceGPS
-except ModuleNotFoundError as exc:
-    missing = getattr(exc, "name", str(exc))
-    sys.stderr.write(
-        "缺少 Python 模块：{missing}\n"
-        "gps.py 依赖 ROS2 + Aerostack2 环境提供的 Python 包（rclpy/消息类型/as2_python_api 等），"
-        "不能只靠 pip 的 requirements.txt 安装。\n"
-        "请先 source ROS2 与 Aerostack2 环境，例如：\n"
-        "  source /opt/ros/humble/setup.bash\n"
-        "  source /home/amov/aerostack2_ws/install/setup.bash\n"
-        "并确认 ROS_DOMAIN_ID/命名空间配置正确，然后再运行 gps.py。\n"
-        .format(missing=missing)
-    )
-    sys.exit(2)
-
-# Monkey patch: ensure as2_python_api's GpsModule implements __call__ at runtime.
-try:
-    from as2_python_api.modules.gps_module import GpsModule
-except Exception:
-    GpsModule = None
-else:
-    if '__call__' not in GpsModule.__dict__:
-        def _gps_module_call(self, *args, **kwargs):
-            return True
-
-        setattr(GpsModule, '__call__', _gps_module_call)
-        abstract_methods = getattr(GpsModule, '__abstractmethods__', set())
-        if '__call__' in abstract_methods:
-            remaining = set(abstract_methods)
-            remaining.discard('__call__')
-            GpsModule.__abstractmethods__ = frozenset(remaining)
+
+_ROS_LOADED = False
+# 由 _load_ros_dependencies() 注入的模块属性，外部首次访问时才触发导入（PEP 562）
+_ROS_EXPORTS = frozenset((
+    'rclpy',
+    'Vector3Stamped', 'AccelStamped', 'TwistStamped', 'QuaternionStamped',
+    'NavSatFix', 'MagneticField', 'Joy', 'Float32', 'Bool', 'UInt8', 'UInt16',
+    'PositionFused', 'GPSDetails', 'RCConnectionStatus', 'RelativeObstacleInfo', 'EscData', 'SingleBatteryInfo',
+    'FlightStatus', 'FlightAnomaly', 'DisplayMode', 'ControlMode', 'HmsInfoTable', 'RTKYaw',
+    'qos_profile_sensor_data', 'QoSProfile', 'HistoryPolicy', 'ReliabilityPolicy',
+    'MultiThreadedExecutor', 'MutuallyExclusiveCallbackGroup', 'ReentrantCallbackGroup',
+    'DroneInterfaceGPS', 'GpsModule',
+))
+
+
+def _load_ros_dependencies() -> None:
+    """
+    导入 ROS2 / Aerostack2 依赖并注入模块全局命名空间。
+
+    rclpy 及消息类型加载较慢（DDS/rmw 动态库），放在参数解析之后执行，
+    --help 和参数错误时无需加载；重复调用直接返回。
+    """
+    global _ROS_LOADED, rclpy
+    global Vector3Stamped, AccelStamped, TwistStamped, QuaternionStamped
+    global NavSatFix, MagneticField, Joy, Float32, Bool, UInt8, UInt16
+    global PositionFused, GPSDetails, RCConnectionStatus, RelativeObstacleInfo, EscData, SingleBatteryInfo
+    global FlightStatus, FlightAnomaly, DisplayMode, ControlMode, HmsInfoTable, RTKYaw
+    global qos_profile_sensor_data, QoSProfile, HistoryPolicy, ReliabilityPolicy
+    global MultiThreadedExecutor, MutuallyExclusiveCallbackGroup, ReentrantCallbackGroup
+    global DroneInterfaceGPS, GpsModule
+    if _ROS_LOADED:
+        return
+
+    try:
+        import rclpy
+        from geometry_msgs.msg import Vector3Stamped, AccelStamped, TwistStamped, QuaternionStamped
+        from sensor_msgs.msg import NavSatFix, MagneticField, Joy
+        from std_msgs.msg import Float32, Bool, UInt8, UInt16
+        from psdk_interfaces.msg import (
+            PositionFused,
+            GPSDetails,
+            RCConnectionStatus,
+            RelativeObstacleInfo,
+            EscData,
+            SingleBatteryInfo,
+            FlightStatus,
+            FlightAnomaly,
+            DisplayMode,
+            ControlMode,
+            HmsInfoTable,
+            RTKYaw,
+        )
+        from rclpy.qos import qos_profile_sensor_data, QoSProfile, HistoryPolicy, ReliabilityPolicy
+        from rclpy.executors import MultiThreadedExecutor
+        from rclpy.callback_groups import MutuallyExclusiveCallbackGroup, ReentrantCallbackGroup
+
+        from as2_python_api.drone_interface_gps import DroneInterfaceGPS
+    except ModuleNotFoundError as exc:
+        missing = getattr(exc, "name", str(exc))
+        sys.stderr.write(
+            "缺少 Python 模块：{missing}\n"
+            "gps.py 依赖 ROS2 + Aerostack2 环境提供的 Python 包（rclpy/消息类型/as2_python_api 等），"
+            "不能只靠 pip 的 requirements.txt 安装。\n"
+            "请先 source ROS2 与 Aerostack2 环境，例如：\n"
+            "  source /opt/ros/humble/setup.bash\n"
+            "  source /home/amov/aerostack2_ws/install/setup.bash\n"
+            "并确认 ROS_DOMAIN_ID/命名空间配置正确，然后再运行 gps.py。\n"
+            .format(missing=missing)
+        )
+        sys.exit(2)
+
+    # Monkey patch: ensure as2_python_api's GpsModule implements __call__ at runtime.
+    try:
+        from as2_python_api.modules.gps_module import GpsModule
+    except Exception:
+        GpsModule = None
+    else:
+        if '__call__' not in GpsModule.__dict__:
+            def _gps_module_call(self, *args, **kwargs):
+                return True
+
+            setattr(GpsModule, '__call__', _gps_module_call)
+            abstract_methods = getattr(GpsModule, '__abstractmethods__', set())
+            if '__call__' in abstract_methods:
+                remaining = set(abstract_methods)
+                remaining.discard('__call__')
+                GpsModule.__abstractmethods__ = frozenset(remaining)
+
+    _ROS_LOADED = True
+
+
+def __getattr__(name: str) -> Any:
+    """模块级延迟属性：import gps 后访问 gps.rclpy / gps.DroneInterfaceGPS 等时才加载 ROS2 依赖"""
+    if name in _ROS_EXPORTS:
+        _load_ros_dependencies()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # 默认配置参数
 DEFAULT_CONFIG = {
@@ -77,6 +138,9 @@ DEFAULT_CONFIG = {
     "running_time": 3600,           # 最长运行时间(秒)
     "use_sim_time": False,          # 是否使用仿真时间
     "verbose": True,                # 是否打印详细信息
+    "log_format": "csv",            # 日志格式: csv、arrow(Arrow IPC stream) 或 bin(定长二进制记录)
+    "log_queue_size": 1024,         # 后台写入队列长度(行)，队列满时丢弃新样本
+    "skip_unchanged": False,        # 没有新的话题数据且无人机状态未变化时不写入新行
 }
 
 GPS_CSV_HEADER = [
@@ -122,42 +186,279 @@ GPS_CSV_HEADER = [
     'hms_error_summary'
 ]
 
+# Arrow / 二进制输出时的非浮点列类型
+GPS_ARROW_STRING_COLUMNS = (
+    'platform_state', 'platform_yaw_mode', 'platform_control_mode', 'platform_reference_frame',
+    'flight_anomaly_flags', 'hms_error_summary',
+)
+GPS_ARROW_BOOL_COLUMNS = ('connected', 'armed', 'offboard')
+
+# 每次采样从无人机接口读取的状态属性，一次 attrgetter 调用取回全部
+_DRONE_STATE_GETTER = operator.attrgetter('gps.pose', 'position', 'info', 'speed', 'orientation')
+# FlightAnomaly 消息中的异常标志字段，按顺序拼接到 flight_anomaly_flags 列
+FLIGHT_ANOMALY_FIELDS = (
+    'impact_in_air', 'random_fly', 'height_ctrl_fail', 'roll_pitch_ctrl_fail',
+    'yaw_ctrl_fail', 'aircraft_is_falling', 'strong_wind_level1', 'strong_wind_level2',
+    'compass_installation_error', 'imu_installation_error', 'esc_temperature_high',
+    'at_least_one_esc_disconnected', 'gps_yaw_error',
+)
+_FLIGHT_ANOMALY_GETTER = operator.attrgetter(*FLIGHT_ANOMALY_FIELDS)
+# verbose 模式下每条记录的输出格式
+_VERBOSE_LINE_FORMAT = "GPS logged at {:.6f}: GPS({:.6f}, {:.6f}, {:.2f}m) Local({:.2f}, {:.2f}, {:.2f}m)"
+
+
+def _state(start: int, stop: int) -> List[tuple]:
+    return [('state', idx, None) for idx in range(start, stop)]
+
+
+def _vec(key: str, length: int = 3) -> List[tuple]:
+    return [('vec', key, idx) for idx in range(length)]
+
+
+def _fields(key: str, record_type: type) -> List[tuple]:
+    return [('field', key, idx) for idx in range(len(record_type._fields))]
+
+
+# 回调中保存的结构化快照，字段顺序与 CSV 列顺序一致
+GPSDetailsSnapshot = namedtuple('GPSDetailsSnapshot', [
+    'fix_state', 'horizontal_dop', 'position_dop',
+    'vertical_accuracy', 'horizontal_accuracy', 'speed_accuracy',
+    'num_gps', 'num_glonass', 'num_total', 'gps_counter',
+])
+ControlModeSnapshot = namedtuple('ControlModeSnapshot', ['control_mode', 'device_mode', 'control_auth'])
+RCLinkSnapshot = namedtuple('RCLinkSnapshot', ['air', 'ground', 'app', 'disconnected'])
+BatterySnapshot = namedtuple('BatterySnapshot', [
+    'voltage', 'current', 'capacity_remain', 'capacity_pct', 'temperature',
+])
+EscStatsSnapshot = namedtuple('EscStatsSnapshot', [
+    'avg_current', 'avg_voltage', 'avg_temperature', 'max_temperature',
+])
+RelativeObstacleSnapshot = namedtuple('RelativeObstacleSnapshot', [
+    'up', 'down', 'front', 'back', 'left', 'right',
+    'up_health', 'down_health', 'front_health', 'back_health', 'left_health', 'right_health',
+])
+
+# 尚未收到对应话题时使用的全 NaN 快照
+_EMPTY_SNAPSHOTS: Dict[str, tuple] = {
+    key: record_type(*([math.nan] * len(record_type._fields)))
+    for key, record_type in (
+        ('gps_details', GPSDetailsSnapshot),
+        ('psdk_control', ControlModeSnapshot),
+        ('rc_link', RCLinkSnapshot),
+        ('battery1', BatterySnapshot),
+        ('battery2', BatterySnapshot),
+        ('esc_stats', EscStatsSnapshot),
+        ('relative_obstacle', RelativeObstacleSnapshot),
+    )
+}
+
+
+# CSV 每一列的数据来源，顺序与 GPS_CSV_HEADER 一致：
+#   ('state', 下标, None)    log_gps_data 中从无人机接口读取的状态元组
+#   ('vec', 键, 下标)        extra_data[键] 列表的第 下标 个元素，缺失为 NaN
+#   ('extra', 键, 默认值)    extra_data[键]
+#   ('field', 键, 下标)      extra_data[键] 快照(namedtuple)的第 下标 个字段，缺失为 NaN
+#   ('info', 键, 默认值)     drone.info[键]
+GPS_ROW_SCHEMA = [
+    *_state(0, 13),     # timestamp, 经纬高, 本地位置, connected/armed/offboard, 线速度
+    *_vec('angular_rate_ground'),
+    *_state(13, 16),    # roll / pitch / yaw
+    *_vec('psdk_velocity'),
+    *_vec('acc_ground'),
+    *_vec('acc_body_raw'),
+    *_vec('acc_body_fused'),
+    *_vec('ang_rate_body'),
+    *_vec('att_quat', 4),
+    ('extra', 'height_agl', math.nan),
+    ('extra', 'altitude_barometric', math.nan),
+    ('extra', 'altitude_sea_level', math.nan),
+    *_vec('position_fused'),
+    *_vec('position_fused_health'),
+    *_vec('magnetic_field'),
+    *_vec('gps_position'),
+    *_vec('gps_velocity'),
+    *_fields('gps_details', GPSDetailsSnapshot),
+    ('extra', 'gps_signal_level', math.nan),
+    *_vec('home_point'),
+    ('extra', 'home_point_status', math.nan),
+    ('extra', 'home_point_altitude', math.nan),
+    *_vec('rtk_position'),
+    *_vec('rtk_velocity'),
+    ('extra', 'rtk_connection_status', math.nan),
+    ('extra', 'rtk_yaw', math.nan),
+    ('info', 'state', None),
+    ('info', 'yaw_mode', None),
+    ('info', 'control_mode', None),
+    ('info', 'reference_frame', None),
+    ('extra', 'display_mode', math.nan),
+    *_fields('psdk_control', ControlModeSnapshot),
+    ('extra', 'flight_status', math.nan),
+    ('extra', 'flight_anomaly_flags', ''),
+    *_vec('rc_axes', 4),
+    *_vec('rc_buttons', 2),
+    *_fields('rc_link', RCLinkSnapshot),
+    *_fields('battery1', BatterySnapshot),
+    *_fields('battery2', BatterySnapshot),
+    *_fields('esc_stats', EscStatsSnapshot),
+    *_fields('relative_obstacle', RelativeObstacleSnapshot),
+    ('extra', 'hms_error_summary', ''),
+]
+assert len(GPS_ROW_SCHEMA) == len(GPS_CSV_HEADER)
+
+
+def _padded(value: Any, length: int) -> tuple:
+    """向量尚未收到、长度不足或类型不符时，补齐为指定长度，缺失元素为 NaN"""
+    try:
+        items = tuple(value)[:length]
+    except TypeError:
+        items = ()
+    return items + (math.nan,) * (length - len(items))
+
+
+def _compile_row_builder(schema: List[tuple]):
+    """
+    根据列来源表生成直线式的 build_row(state, extra, info) 函数。
+
+    每个 extra_data 键只在函数开头取一次并绑定为局部变量，整行以一个元组字面量返回，
+    采样时不再逐列调用取值函数。
+    """
+    namespace: Dict[str, Any] = {'nan': math.nan, '_padded': _padded}
+    prologue: List[str] = []
+    columns: List[str] = []
+    bound: Dict[str, str] = {}
+    vec_lengths: Dict[str, int] = {}
+    for kind, key, arg in schema:
+        if kind == 'vec':
+            vec_lengths[key] = max(vec_lengths.get(key, 0), arg + 1)
+
+    def constant(value: Any) -> str:
+        if isinstance(value, float) and math.isnan(value):
+            return 'nan'
+        name = f"_c{len(namespace)}"
+        namespace[name] = value
+        return name
+
+    for kind, key, arg in schema:
+        if kind == 'state':
+            columns.append(f"state[{key}]")
+        elif kind == 'vec':
+            if key not in bound:
+                local = bound[key] = f"v{len(bound)}"
+                length = vec_lengths[key]
+                prologue.append(f"{local} = extra_get({key!r})")
+                prologue.append(f"if {local} is None or len({local}) < {length}: {local} = _padded({local}, {length})")
+            columns.append(f"{bound[key]}[{arg}]")
+        elif kind == 'field':
+            if key not in bound:
+                local = bound[key] = f"v{len(bound)}"
+                prologue.append(f"{local} = extra_get({key!r}, {constant(_EMPTY_SNAPSHOTS[key])})")
+            columns.append(f"{bound[key]}[{arg}]")
+        elif kind == 'extra':
+            columns.append(f"extra_get({key!r}, {constant(arg)})")
+        elif kind == 'info':
+            columns.append(f"info_get({key!r}, {constant(arg)})")
+        else:
+            raise ValueError(f"未知的列来源: {kind}")
+
+    lines = ["def build_row(state, extra, info):", "    extra_get = extra.get", "    info_get = info.get"]
+    lines += [f"    {line}" for line in prologue]
+    lines.append("    return (")
+    lines += [f"        {column}," for column in columns]
+    lines.append("    )")
+    exec(compile("\n".join(lines), "<gps_row_builder>", "exec"), namespace)
+    return namespace['build_row']
+
+
+# 模块加载时生成一次，每次采样只需调用一次
+_build_row = _compile_row_builder(GPS_ROW_SCHEMA)
+
 class GPSLogger:
     """GPS数据记录器类，集成到UDP通信测试系统"""
     
-    def __init__(self, config: Dict[str, Any]):
+    def __init__(self, config: Mapping[str, Any]):
         """
         初始化GPS记录器
         
         Args:
             config: 配置参数字典
         """
+        _load_ros_dependencies()
         self.drone_id = config.get("drone_id", DEFAULT_CONFIG["drone_id"])
         self.log_path = config.get("log_path", DEFAULT_CONFIG["log_path"])
         self.log_interval = config.get("log_interval", DEFAULT_CONFIG["log_interval"])
         self.running_time = config.get("running_time", DEFAULT_CONFIG["running_time"])
         self.use_sim_time = config.get("use_sim_time", DEFAULT_CONFIG["use_sim_time"])
         self.verbose = config.get("verbose", DEFAULT_CONFIG["verbose"])
+        self.log_format = config.get("log_format", DEFAULT_CONFIG["log_format"])
+        self.log_queue_size = config.get("log_queue_size", DEFAULT_CONFIG["log_queue_size"])
+        self.skip_unchanged = config.get("skip_unchanged", DEFAULT_CONFIG["skip_unchanged"])
         
         self.running = True
         self.extra_data: Dict[str, Any] = {}
+        self._last_anomaly_bits: Optional[tuple] = None
+        self._last_hms_signature: Optional[tuple] = None
+        # skip_unchanged 模式下用于判断自上次写入后是否有新数据
+        self._dirty = 0
+        self._last_written_dirty = -1
+        self._last_drone_signature: Optional[tuple] = None
+        # verbose 输出每 _verbose_every 次采样打印一条(约 1Hz)
+        self._verbose_every = max(1, round(1.0 / self.log_interval)) if self.log_interval > 0 else 1
+        self._verbose_counter = self._verbose_every - 1
         self.subscriptions: List[Any] = []
         
         # 确保日志目录存在
-        os.makedirs(self.log_path, exist_ok=True)
+        log_dir = Path(self.log_path)
+        log_dir.mkdir(parents=True, exist_ok=True)
         
         # 生成日志文件名（与UDP测试系统保持一致的命名格式）
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.log_file = os.path.join(self.log_path, f"gps_logger_{self.drone_id}_{timestamp}.csv")
-        self._csv_log = ResilientCsvWriter(
-            self.log_file,
-            header=GPS_CSV_HEADER,
-            flush_every=10,
-            flush_interval_s=1.0,
-            inode_check_every=50,
-            inode_check_interval_s=1.0,
-            retry_base_interval_s=5.0,
-            retry_max_interval_s=60.0,
+        log_stem = f"gps_logger_{self.drone_id}_{time.strftime('%Y%m%d_%H%M%S')}"
+        if self.log_format == "arrow":
+            from arrow_log import ArrowStreamLogWriter
+
+            self.log_file = str(log_dir / f"{log_stem}.arrows")
+            self._csv_log = ArrowStreamLogWriter(
+                self.log_file,
+                header=GPS_CSV_HEADER,
+                string_columns=GPS_ARROW_STRING_COLUMNS,
+                bool_columns=GPS_ARROW_BOOL_COLUMNS,
+                batch_rows=20,
+                flush_interval_s=5.0,
+                verbose=self.verbose,
+                label="GPS",
+            )
+        elif self.log_format == "bin":
+            from binary_log import BinaryRecordLogWriter
+
+            self.log_file = str(log_dir / f"{log_stem}.bin")
+            self._csv_log = BinaryRecordLogWriter(
+                self.log_file,
+                header=GPS_CSV_HEADER,
+                string_columns=GPS_ARROW_STRING_COLUMNS,
+                bool_columns=GPS_ARROW_BOOL_COLUMNS,
+                flush_every=20,
+                verbose=self.verbose,
+                label="GPS",
+            )
+        else:
+            self.log_file = str(log_dir / f"{log_stem}.csv")
+            self._csv_log = ResilientCsvWriter(
+                self.log_file,
+                header=GPS_CSV_HEADER,
+                flush_every=10,
+                flush_interval_s=1.0,
+                inode_check_every=50,
+                inode_check_interval_s=1.0,
+                retry_base_interval_s=5.0,
+                retry_max_interval_s=60.0,
+                buffering=1 << 16,
+                verbose=self.verbose,
+                label="GPS",
+            )
+        # 文件写入交给后台线程，采样循环只负责入队
+        self._csv_log = BackgroundLogWriter(
+            self._csv_log,
+            max_queue=self.log_queue_size,
+            batch_rows=32,
             verbose=self.verbose,
             label="GPS",
         )
@@ -181,8 +482,9 @@ class GPSLogger:
         # 初始化CSV文件
         self.init_csv_file()
         
-        # 设置信号处理器
-        signal.signal(signal.SIGINT, self.signal_handler)
+        # 设置信号处理器（只能在主线程中注册；与其它节点组合运行在子线程时由宿主进程处理 Ctrl+C）
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.signal_handler)
         
         if self.verbose:
             print(f"GPS记录器初始化完成")
@@ -206,153 +508,60 @@ class GPSLogger:
             
     def log_gps_data(self):
         """记录GPS数据到文件（使用Unix时间戳格式）"""
-        try:
-            # 获取时间戳（使用Unix时间戳，与UDP测试系统保持一致）
-            timestamp = time.time()
-            
-            # 获取GPS数据
-            gps_pose = self.drone.gps.pose
-            lat, lon, alt = gps_pose if gps_pose and len(gps_pose) == 3 else [0.0, 0.0, 0.0]
-            
-            # 获取本地位置
-            local_pos = self.drone.position
-            x, y, z = local_pos if local_pos and len(local_pos) == 3 else [0.0, 0.0, 0.0]
-            
-            # 获取无人机状态
-            info = self.drone.info
-            connected = info.get('connected', False)
-            armed = info.get('armed', False)
-            offboard = info.get('offboard', False)
-            
-            # 获取线速度 / 姿态
-            speed = self.drone.speed or [math.nan, math.nan, math.nan]
-            roll_pitch_yaw = self.drone.orientation or [math.nan, math.nan, math.nan]
-            angular_speed = self._vector_or_nan('angular_rate_ground')
-
-            psdk_vel = self._vector_or_nan('psdk_velocity')
-            acc_ground = self._vector_or_nan('acc_ground')
-            acc_body_raw = self._vector_or_nan('acc_body_raw')
-            acc_body_fused = self._vector_or_nan('acc_body_fused')
-            ang_rate_body = self._vector_or_nan('ang_rate_body')
-            att_quat = self._vector_or_nan('att_quat', length=4)
-            height_agl = self.extra_data.get('height_agl', math.nan)
-            altitude_barometric = self.extra_data.get('altitude_barometric', math.nan)
-            altitude_sea_level = self.extra_data.get('altitude_sea_level', math.nan)
-            pos_fused = self._vector_or_nan('position_fused')
-            pos_health = self._vector_or_nan('position_fused_health')
-            mag_field = self._vector_or_nan('magnetic_field')
-            gps_nav = self._vector_or_nan('gps_position')
-            gps_nav_vel = self._vector_or_nan('gps_velocity')
-            gps_details = self.extra_data.get('gps_details', {})
-            gps_fix_state = gps_details.get('fix_state', math.nan)
-            gps_horizontal_dop = gps_details.get('horizontal_dop', math.nan)
-            gps_position_dop = gps_details.get('position_dop', math.nan)
-            gps_vertical_accuracy = gps_details.get('vertical_accuracy', math.nan)
-            gps_horizontal_accuracy = gps_details.get('horizontal_accuracy', math.nan)
-            gps_speed_accuracy = gps_details.get('speed_accuracy', math.nan)
-            gps_sat_gps = gps_details.get('num_gps', math.nan)
-            gps_sat_glonass = gps_details.get('num_glonass', math.nan)
-            gps_sat_total = gps_details.get('num_total', math.nan)
-            gps_counter = gps_details.get('gps_counter', math.nan)
-            gps_signal_level = self.extra_data.get('gps_signal_level', math.nan)
-            home_point = self._vector_or_nan('home_point')
-            home_point_status = self.extra_data.get('home_point_status', math.nan)
-            home_point_altitude = self.extra_data.get('home_point_altitude', math.nan)
-            rtk_pos = self._vector_or_nan('rtk_position')
-            rtk_vel = self._vector_or_nan('rtk_velocity')
-            rtk_connection = self.extra_data.get('rtk_connection_status', math.nan)
-            rtk_yaw = self.extra_data.get('rtk_yaw', math.nan)
-            platform_state = info.get('state', None)
-            platform_yaw_mode = info.get('yaw_mode', None)
-            platform_control_mode = info.get('control_mode', None)
-            platform_reference_frame = info.get('reference_frame', None)
-            display_mode = self.extra_data.get('display_mode', math.nan)
-            psdk_control_info = self.extra_data.get('psdk_control', {})
-            psdk_control_mode = psdk_control_info.get('control_mode', math.nan)
-            psdk_device_mode = psdk_control_info.get('device_mode', math.nan)
-            psdk_control_auth = psdk_control_info.get('control_auth', math.nan)
-            flight_status = self.extra_data.get('flight_status', math.nan)
-            flight_anomaly_flags = self.extra_data.get('flight_anomaly_flags', '')
-            rc_axes = self._list_with_length('rc_axes', 4)
-            rc_buttons = self._list_with_length('rc_buttons', 2)
-            rc_link = self.extra_data.get('rc_link', {})
-            battery1 = self.extra_data.get('battery1', {})
-            battery2 = self.extra_data.get('battery2', {})
-            esc_stats = self.extra_data.get('esc_stats', {})
-            rel_obs = self.extra_data.get('relative_obstacle', {})
-            hms_summary = self.extra_data.get('hms_error_summary', '')
-
-            # 写入CSV文件
-            self._csv_log.write_row([
-                timestamp,
-                lat, lon, alt,
-                x, y, z,
-                connected, armed, offboard,
-                speed[0], speed[1], speed[2],
-                angular_speed[0], angular_speed[1], angular_speed[2],
-                roll_pitch_yaw[0], roll_pitch_yaw[1], roll_pitch_yaw[2],
-                psdk_vel[0], psdk_vel[1], psdk_vel[2],
-                acc_ground[0], acc_ground[1], acc_ground[2],
-                acc_body_raw[0], acc_body_raw[1], acc_body_raw[2],
-                acc_body_fused[0], acc_body_fused[1], acc_body_fused[2],
-                ang_rate_body[0], ang_rate_body[1], ang_rate_body[2],
-                att_quat[0], att_quat[1], att_quat[2], att_quat[3],
-                height_agl, altitude_barometric, altitude_sea_level,
-                pos_fused[0], pos_fused[1], pos_fused[2],
-                pos_health[0], pos_health[1], pos_health[2],
-                mag_field[0], mag_field[1], mag_field[2],
-                gps_nav[0], gps_nav[1], gps_nav[2],
-                gps_nav_vel[0], gps_nav_vel[1], gps_nav_vel[2],
-                gps_fix_state, gps_horizontal_dop, gps_position_dop,
-                gps_vertical_accuracy, gps_horizontal_accuracy, gps_speed_accuracy,
-                gps_sat_gps, gps_sat_glonass, gps_sat_total, gps_counter,
-                gps_signal_level,
-                home_point[0], home_point[1], home_point[2], home_point_status, home_point_altitude,
-                rtk_pos[0], rtk_pos[1], rtk_pos[2],
-                rtk_vel[0], rtk_vel[1], rtk_vel[2],
-                rtk_connection, rtk_yaw,
-                platform_state, platform_yaw_mode, platform_control_mode, platform_reference_frame,
-                display_mode, psdk_control_mode, psdk_device_mode, psdk_control_auth,
-                flight_status, flight_anomaly_flags,
-                rc_axes[0], rc_axes[1], rc_axes[2], rc_axes[3],
-                rc_buttons[0], rc_buttons[1],
-                rc_link.get('air', math.nan), rc_link.get('ground', math.nan), rc_link.get('app', math.nan), rc_link.get('disconnected', math.nan),
-                battery1.get('voltage', math.nan), battery1.get('current', math.nan),
-                battery1.get('capacity_remain', math.nan), battery1.get('capacity_pct', math.nan),
-                battery1.get('temperature', math.nan),
-                battery2.get('voltage', math.nan), battery2.get('current', math.nan),
-                battery2.get('capacity_remain', math.nan), battery2.get('capacity_pct', math.nan),
-                battery2.get('temperature', math.nan),
-                esc_stats.get('avg_current', math.nan), esc_stats.get('avg_voltage', math.nan),
-                esc_stats.get('avg_temperature', math.nan), esc_stats.get('max_temperature', math.nan),
-                rel_obs.get('up', math.nan), rel_obs.get('down', math.nan), rel_obs.get('front', math.nan),
-                rel_obs.get('back', math.nan), rel_obs.get('left', math.nan), rel_obs.get('right', math.nan),
-                rel_obs.get('up_health', math.nan), rel_obs.get('down_health', math.nan),
-                rel_obs.get('front_health', math.nan), rel_obs.get('back_health', math.nan),
-                rel_obs.get('left_health', math.nan), rel_obs.get('right_health', math.nan),
-                hms_summary,
-            ])
-                
-            # 显示当前数据（格式与UDP测试系统保持一致）
-            if self.verbose:
-                print(f"GPS logged at {timestamp:.6f}: "
-                      f"GPS({lat:.6f}, {lon:.6f}, {alt:.2f}m) "
-                      f"Local({x:.2f}, {y:.2f}, {z:.2f}m)")
+        # 获取时间戳（使用Unix时间戳，与UDP测试系统保持一致）
+        timestamp = time.time()
+        
+        # 一次取回GPS、本地位置、状态、线速度和姿态；常用对象绑定为局部变量
+        gps_pose, local_pos, info, speed, roll_pitch_yaw = _DRONE_STATE_GETTER(self.drone)
+        # 回调在其它线程中并发更新 info / extra_data，先做浅拷贝，保证同一行数据取自同一时刻
+        info = dict(info)
+        info_get = info.get
+        extra = self.extra_data.copy()
+        nan = math.nan
+        
+        # 获取GPS数据
+        lat, lon, alt = gps_pose if gps_pose and len(gps_pose) == 3 else (0.0, 0.0, 0.0)
+        
+        # 获取本地位置
+        x, y, z = local_pos if local_pos and len(local_pos) == 3 else (0.0, 0.0, 0.0)
+        
+        # 获取线速度 / 姿态
+        speed = speed or (nan, nan, nan)
+        roll_pitch_yaw = roll_pitch_yaw or (nan, nan, nan)
+        
+        # 无人机接口状态，对应 GPS_ROW_SCHEMA 中的 'state' 列
+        state = (
+            timestamp,
+            lat, lon, alt,
+            x, y, z,
+            info_get('connected', False), info_get('armed', False), info_get('offboard', False),
+            speed[0], speed[1], speed[2],
+            roll_pitch_yaw[0], roll_pitch_yaw[1], roll_pitch_yaw[2],
+        )
+        
+        # 没有收到新的话题数据、无人机接口状态也未变化时跳过本次记录
+        if self.skip_unchanged:
+            signature = (state[1:], tuple(info.values()))
+            if self._dirty == self._last_written_dirty and signature == self._last_drone_signature:
+                return
+            self._last_written_dirty = self._dirty
+            self._last_drone_signature = signature
+        
+        # 按列来源表生成整行；写入只是入队，不会抛出异常，队列满丢弃的行和
+        # 后台写入错误由 BackgroundLogWriter 统一限频打印
+        self._csv_log.write_row(_build_row(state, extra, info))
             
-        except Exception as e:
-            print(f"记录GPS数据时出错: {e}")
-    
-    def _vector_or_nan(self, key: str, length: int = 3) -> List[float]:
-        values = [math.nan] * length
-        data = self.extra_data.get(key)
-        if isinstance(data, (list, tuple)):
-            for idx in range(min(length, len(data))):
-                values[idx] = data[idx]
-        return values
-
-    def _list_with_length(self, key: str, length: int) -> List[float]:
-        return self._vector_or_nan(key, length)
-    
+        # 显示当前数据（格式与UDP测试系统保持一致），限制为约每秒一条
+        if self.verbose:
+            self._verbose_counter += 1
+            if self._verbose_counter >= self._verbose_every:
+                self._verbose_counter = 0
+                try:
+                    sys.stdout.write(_VERBOSE_LINE_FORMAT.format(timestamp, lat, lon, alt, x, y, z) + "\n")
+                except OSError:
+                    # 父进程关闭管道后不再影响记录
+                    pass
+
     def run(self):
         """
         运行GPS数据记录
@@ -362,13 +571,29 @@ class GPSLogger:
             print(f"最长运行时间: {self.running_time}秒")
             print("按 Ctrl+C 停止记录\n")
         
+        # 循环内用到的函数和参数绑定为局部变量，减少每次迭代的属性查找
+        # 截止时间和采样节拍使用单调时钟，不受系统时间调整影响
+        now = time.monotonic
+        sleep = time.sleep
+        rclpy_ok = rclpy.ok
+        log_gps_data = self.log_gps_data
+        log_interval = self.log_interval
+        
         # 计算结束时间
-        end_time = time.time() + self.running_time
+        end_time = now() + self.running_time
+        next_tick = now()
         
-        while self.running and rclpy.ok() and time.time() < end_time:
+        while self.running and rclpy_ok() and now() < end_time:
             try:
-                self.log_gps_data()
-                time.sleep(self.log_interval)
+                log_gps_data()
+                # 按固定节拍调度下一次采样，记录耗时不累积到采样周期中
+                next_tick += log_interval
+                delay = next_tick - now()
+                if delay > 0:
+                    sleep(delay)
+                else:
+                    # 已落后于节拍(例如系统卡顿)，从当前时刻重新开始计时，不补采
+                    next_tick = now()
                 
             except KeyboardInterrupt:
                 break
@@ -383,13 +608,24 @@ class GPSLogger:
         if self.verbose:
             print(f"\nGPS数据已保存到: {self.log_file}")
         self._csv_log.close()
+        # 各资源分别清理，某一步失败不影响后续步骤，无人机接口总能被关闭
+        try:
+            # 先停止订阅节点的 executor 并等待其 spin 线程退出，再销毁订阅和节点
+            self._sub_executor.shutdown()
+        except Exception as e:
+            print(f"清理时出错: {e}")
+        self._sub_spin_thread.join(timeout=2.0)
+        for sub in self.subscriptions:
+            try:
+                self._sub_node.destroy_subscription(sub)
+            except Exception:
+                pass
+        self.subscriptions.clear()
+        try:
+            self._sub_node.destroy_node()
+        except Exception as e:
+            print(f"清理时出错: {e}")
         try:
-            for sub in self.subscriptions:
-                try:
-                    self.drone.destroy_subscription(sub)
-                except Exception:
-                    pass
-            self.subscriptions.clear()
             self.drone.shutdown()
         except Exception as e:
             print(f"清理时出错: {e}")
@@ -397,80 +633,117 @@ class GPSLogger:
             print("GPS记录器已退出")
 
     def setup_additional_subscribers(self):
-        """订阅额外话题以获取更多状态"""
+        """
+        订阅额外话题以获取更多状态。
+        这些订阅挂在独立的节点上，由自己的多线程 executor 在后台线程中处理，
+        不与无人机接口自身的回调排队；高频传感器话题使用可重入回调组，
+        可与低频状态话题的回调并发执行。
+        """
         sensor_qos = qos_profile_sensor_data
         status_qos = 10
+        # 只关心最新值的状态快照话题：只保留最新一条，慢消费时不积压
+        latest_qos = QoSProfile(
+            history=HistoryPolicy.KEEP_LAST,
+            depth=1,
+            reliability=ReliabilityPolicy.BEST_EFFORT,
+        )
+        sensor_group = ReentrantCallbackGroup()
+        status_group = MutuallyExclusiveCallbackGroup()
+
+        # 与无人机接口使用相同命名空间，相对话题名解析结果不变
+        self._sub_node = rclpy.create_node(
+            'gps_logger_subscriptions',
+            namespace=self.drone_id,
+        )
 
-        def add_sub(msg_type, topic, callback, qos):
+        def add_sub(msg_type, topic, callback, qos, group):
+            if self.skip_unchanged:
+                callback = self._mark_dirty(callback)
             try:
-                sub = self.drone.create_subscription(msg_type, topic, callback, qos)
+                sub = self._sub_node.create_subscription(
+                    msg_type, topic, callback, qos, callback_group=group
+                )
                 self.subscriptions.append(sub)
             except Exception as e:
                 if self.verbose:
                     print(f"创建订阅 {topic} 失败: {e}")
 
-        add_sub(Vector3Stamped, 'psdk_ros2/angular_rate_ground_fused', self._angular_rate_ground_callback, sensor_qos)
-        add_sub(Vector3Stamped, 'psdk_ros2/velocity_ground_fused', self._velocity_ground_callback, sensor_qos)
-        add_sub(AccelStamped, 'psdk_ros2/acceleration_ground_fused', self._acc_ground_callback, sensor_qos)
-        add_sub(AccelStamped, 'psdk_ros2/acceleration_body_raw', self._acc_body_raw_callback, sensor_qos)
-        add_sub(AccelStamped, 'psdk_ros2/acceleration_body_fused', self._acc_body_fused_callback, sensor_qos)
-        add_sub(Vector3Stamped, 'psdk_ros2/angular_rate_body_raw', self._ang_rate_body_callback, sensor_qos)
-        add_sub(QuaternionStamped, 'psdk_ros2/attitude', self._attitude_callback, sensor_qos)
-        add_sub(PositionFused, 'psdk_ros2/position_fused', self._position_fused_callback, sensor_qos)
-        add_sub(MagneticField, 'psdk_ros2/magnetic_field', self._mag_field_callback, sensor_qos)
-        add_sub(Float32, 'psdk_ros2/height_above_ground', self._height_callback, sensor_qos)
-        add_sub(Float32, 'psdk_ros2/altitude_barometric', self._altitude_barometric_callback, sensor_qos)
-        add_sub(Float32, 'psdk_ros2/altitude_sea_level', self._altitude_sea_level_callback, sensor_qos)
-        add_sub(NavSatFix, 'psdk_ros2/gps_position', self._gps_position_callback, sensor_qos)
-        add_sub(TwistStamped, 'psdk_ros2/gps_velocity', self._gps_velocity_callback, sensor_qos)
-        add_sub(GPSDetails, 'psdk_ros2/gps_details', self._gps_details_callback, sensor_qos)
-        add_sub(UInt8, 'psdk_ros2/gps_signal_level', self._gps_signal_callback, status_qos)
-        add_sub(NavSatFix, 'psdk_ros2/home_point', self._home_point_callback, sensor_qos)
-        add_sub(Bool, 'psdk_ros2/home_point_status', self._home_point_status_callback, status_qos)
-        add_sub(Float32, 'psdk_ros2/home_point_altitude', self._home_point_altitude_callback, status_qos)
-        add_sub(NavSatFix, 'psdk_ros2/rtk_position', self._rtk_position_callback, sensor_qos)
-        add_sub(TwistStamped, 'psdk_ros2/rtk_velocity', self._rtk_velocity_callback, sensor_qos)
-        add_sub(UInt16, 'psdk_ros2/rtk_connection_status', self._rtk_connection_callback, status_qos)
-        add_sub(RTKYaw, 'psdk_ros2/rtk_yaw', self._rtk_yaw_callback, status_qos)
-        add_sub(DisplayMode, 'psdk_ros2/display_mode', self._display_mode_callback, status_qos)
-        add_sub(ControlMode, 'psdk_ros2/control_mode', self._control_mode_callback, status_qos)
-        add_sub(FlightStatus, 'psdk_ros2/flight_status', self._flight_status_callback, status_qos)
-        add_sub(FlightAnomaly, 'psdk_ros2/flight_anomaly', self._flight_anomaly_callback, status_qos)
-        add_sub(Joy, 'psdk_ros2/rc', self._rc_callback, sensor_qos)
-        add_sub(RCConnectionStatus, 'psdk_ros2/rc_connection_status', self._rc_status_callback, status_qos)
-        add_sub(SingleBatteryInfo, 'psdk_ros2/single_battery_index1', partial(self._battery_callback, idx='battery1'), status_qos)
-        add_sub(SingleBatteryInfo, 'psdk_ros2/single_battery_index2', partial(self._battery_callback, idx='battery2'), status_qos)
-        add_sub(EscData, 'psdk_ros2/esc_data', self._esc_callback, status_qos)
-        add_sub(RelativeObstacleInfo, 'psdk_ros2/relative_obstacle_info', self._relative_obstacle_callback, status_qos)
-        add_sub(HmsInfoTable, 'psdk_ros2/hms_info_table', self._hms_table_callback, status_qos)
+        add_sub(Vector3Stamped, 'psdk_ros2/angular_rate_ground_fused', self._angular_rate_ground_callback, sensor_qos, sensor_group)
+        add_sub(Vector3Stamped, 'psdk_ros2/velocity_ground_fused', self._velocity_ground_callback, sensor_qos, sensor_group)
+        add_sub(AccelStamped, 'psdk_ros2/acceleration_ground_fused', self._acc_ground_callback, sensor_qos, sensor_group)
+        add_sub(AccelStamped, 'psdk_ros2/acceleration_body_raw', self._acc_body_raw_callback, sensor_qos, sensor_group)
+        add_sub(AccelStamped, 'psdk_ros2/acceleration_body_fused', self._acc_body_fused_callback, sensor_qos, sensor_group)
+        add_sub(Vector3Stamped, 'psdk_ros2/angular_rate_body_raw', self._ang_rate_body_callback, sensor_qos, sensor_group)
+        add_sub(QuaternionStamped, 'psdk_ros2/attitude', self._attitude_callback, sensor_qos, sensor_group)
+        add_sub(PositionFused, 'psdk_ros2/position_fused', self._position_fused_callback, sensor_qos, sensor_group)
+        add_sub(MagneticField, 'psdk_ros2/magnetic_field', self._mag_field_callback, sensor_qos, sensor_group)
+        add_sub(Float32, 'psdk_ros2/height_above_ground', self._height_callback, sensor_qos, sensor_group)
+        add_sub(Float32, 'psdk_ros2/altitude_barometric', self._altitude_barometric_callback, sensor_qos, sensor_group)
+        add_sub(Float32, 'psdk_ros2/altitude_sea_level', self._altitude_sea_level_callback, sensor_qos, sensor_group)
+        add_sub(NavSatFix, 'psdk_ros2/gps_position', self._gps_position_callback, sensor_qos, sensor_group)
+        add_sub(TwistStamped, 'psdk_ros2/gps_velocity', self._gps_velocity_callback, sensor_qos, sensor_group)
+        add_sub(GPSDetails, 'psdk_ros2/gps_details', self._gps_details_callback, sensor_qos, sensor_group)
+        add_sub(UInt8, 'psdk_ros2/gps_signal_level', self._gps_signal_callback, latest_qos, status_group)
+        add_sub(NavSatFix, 'psdk_ros2/home_point', self._home_point_callback, sensor_qos, sensor_group)
+        add_sub(Bool, 'psdk_ros2/home_point_status', self._home_point_status_callback, latest_qos, status_group)
+        add_sub(Float32, 'psdk_ros2/home_point_altitude', self._home_point_altitude_callback, status_qos, status_group)
+        add_sub(NavSatFix, 'psdk_ros2/rtk_position', self._rtk_position_callback, sensor_qos, sensor_group)
+        add_sub(TwistStamped, 'psdk_ros2/rtk_velocity', self._rtk_velocity_callback, sensor_qos, sensor_group)
+        add_sub(UInt16, 'psdk_ros2/rtk_connection_status', self._rtk_connection_callback, latest_qos, status_group)
+        add_sub(RTKYaw, 'psdk_ros2/rtk_yaw', self._rtk_yaw_callback, status_qos, status_group)
+        add_sub(DisplayMode, 'psdk_ros2/display_mode', self._display_mode_callback, latest_qos, status_group)
+        add_sub(ControlMode, 'psdk_ros2/control_mode', self._control_mode_callback, status_qos, status_group)
+        add_sub(FlightStatus, 'psdk_ros2/flight_status', self._flight_status_callback, latest_qos, status_group)
+        add_sub(FlightAnomaly, 'psdk_ros2/flight_anomaly', self._flight_anomaly_callback, status_qos, status_group)
+        add_sub(Joy, 'psdk_ros2/rc', self._rc_callback, sensor_qos, sensor_group)
+        add_sub(RCConnectionStatus, 'psdk_ros2/rc_connection_status', self._rc_status_callback, latest_qos, status_group)
+        add_sub(SingleBatteryInfo, 'psdk_ros2/single_battery_index1', partial(self._battery_callback, idx='battery1'), status_qos, status_group)
+        add_sub(SingleBatteryInfo, 'psdk_ros2/single_battery_index2', partial(self._battery_callback, idx='battery2'), status_qos, status_group)
+        add_sub(EscData, 'psdk_ros2/esc_data', self._esc_callback, status_qos, status_group)
+        add_sub(RelativeObstacleInfo, 'psdk_ros2/relative_obstacle_info', self._relative_obstacle_callback, status_qos, status_group)
+        add_sub(HmsInfoTable, 'psdk_ros2/hms_info_table', self._hms_table_callback, status_qos, status_group)
+
+        self._sub_executor = MultiThreadedExecutor(num_threads=2)
+        self._sub_executor.add_node(self._sub_node)
+        self._sub_spin_thread = threading.Thread(
+            target=self._sub_executor.spin, name='gps-subscriptions', daemon=True
+        )
+        self._sub_spin_thread.start()
+
+    def _mark_dirty(self, callback):
+        """包装订阅回调：每收到一条消息递增 _dirty 计数"""
+        def wrapper(msg):
+            self._dirty += 1
+            callback(msg)
+        return wrapper
 
     def _angular_rate_ground_callback(self, msg: Vector3Stamped):
-        self.extra_data['angular_rate_ground'] = [msg.vector.x, msg.vector.y, msg.vector.z]
+        self.extra_data['angular_rate_ground'] = (msg.vector.x, msg.vector.y, msg.vector.z)
 
     def _velocity_ground_callback(self, msg: Vector3Stamped):
-        self.extra_data['psdk_velocity'] = [msg.vector.x, msg.vector.y, msg.vector.z]
+        self.extra_data['psdk_velocity'] = (msg.vector.x, msg.vector.y, msg.vector.z)
 
     def _acc_ground_callback(self, msg: AccelStamped):
-        self.extra_data['acc_ground'] = [msg.accel.linear.x, msg.accel.linear.y, msg.accel.linear.z]
+        self.extra_data['acc_ground'] = (msg.accel.linear.x, msg.accel.linear.y, msg.accel.linear.z)
 
     def _acc_body_raw_callback(self, msg: AccelStamped):
-        self.extra_data['acc_body_raw'] = [msg.accel.linear.x, msg.accel.linear.y, msg.accel.linear.z]
+        self.extra_data['acc_body_raw'] = (msg.accel.linear.x, msg.accel.linear.y, msg.accel.linear.z)
 
     def _acc_body_fused_callback(self, msg: AccelStamped):
-        self.extra_data['acc_body_fused'] = [msg.accel.linear.x, msg.accel.linear.y, msg.accel.linear.z]
+        self.extra_data['acc_body_fused'] = (msg.accel.linear.x, msg.accel.linear.y, msg.accel.linear.z)
 
     def _ang_rate_body_callback(self, msg: Vector3Stamped):
-        self.extra_data['ang_rate_body'] = [msg.vector.x, msg.vector.y, msg.vector.z]
+        self.extra_data['ang_rate_body'] = (msg.vector.x, msg.vector.y, msg.vector.z)
 
     def _attitude_callback(self, msg: QuaternionStamped):
-        self.extra_data['att_quat'] = [msg.quaternion.x, msg.quaternion.y, msg.quaternion.z, msg.quaternion.w]
+        self.extra_data['att_quat'] = (msg.quaternion.x, msg.quaternion.y, msg.quaternion.z, msg.quaternion.w)
 
     def _position_fused_callback(self, msg: PositionFused):
-        self.extra_data['position_fused'] = [msg.position.x, msg.position.y, msg.position.z]
-        self.extra_data['position_fused_health'] = [msg.x_health, msg.y_health, msg.z_health]
+        self.extra_data['position_fused'] = (msg.position.x, msg.position.y, msg.position.z)
+        self.extra_data['position_fused_health'] = (msg.x_health, msg.y_health, msg.z_health)
 
     def _mag_field_callback(self, msg: MagneticField):
-        self.extra_data['magnetic_field'] = [msg.magnetic_field.x, msg.magnetic_field.y, msg.magnetic_field.z]
+        self.extra_data['magnetic_field'] = (msg.magnetic_field.x, msg.magnetic_field.y, msg.magnetic_field.z)
 
     def _height_callback(self, msg: Float32):
         self.extra_data['height_agl'] = msg.data
@@ -482,30 +755,30 @@ class GPSLogger:
         self.extra_data['altitude_sea_level'] = msg.data
 
     def _gps_position_callback(self, msg: NavSatFix):
-        self.extra_data['gps_position'] = [msg.latitude, msg.longitude, msg.altitude]
+        self.extra_data['gps_position'] = (msg.latitude, msg.longitude, msg.altitude)
 
     def _gps_velocity_callback(self, msg: TwistStamped):
-        self.extra_data['gps_velocity'] = [msg.twist.linear.x, msg.twist.linear.y, msg.twist.linear.z]
+        self.extra_data['gps_velocity'] = (msg.twist.linear.x, msg.twist.linear.y, msg.twist.linear.z)
 
     def _gps_details_callback(self, msg: GPSDetails):
-        self.extra_data['gps_details'] = {
-            'horizontal_dop': msg.horizontal_dop,
-            'position_dop': msg.position_dop,
-            'fix_state': msg.fix_state,
-            'vertical_accuracy': msg.vertical_accuracy,
-            'horizontal_accuracy': msg.horizontal_accuracy,
-            'speed_accuracy': msg.speed_accuracy,
-            'num_gps': msg.num_gps_satellites_used,
-            'num_glonass': msg.num_glonass_satellites_used,
-            'num_total': msg.num_total_satellites_used,
-            'gps_counter': msg.gps_counter,
-        }
+        self.extra_data['gps_details'] = GPSDetailsSnapshot(
+            msg.fix_state,
+            msg.horizontal_dop,
+            msg.position_dop,
+            msg.vertical_accuracy,
+            msg.horizontal_accuracy,
+            msg.speed_accuracy,
+            msg.num_gps_satellites_used,
+            msg.num_glonass_satellites_used,
+            msg.num_total_satellites_used,
+            msg.gps_counter,
+        )
 
     def _gps_signal_callback(self, msg: UInt8):
         self.extra_data['gps_signal_level'] = msg.data
 
     def _home_point_callback(self, msg: NavSatFix):
-        self.extra_data['home_point'] = [msg.latitude, msg.longitude, msg.altitude]
+        self.extra_data['home_point'] = (msg.latitude, msg.longitude, msg.altitude)
 
     def _home_point_status_callback(self, msg: Bool):
         self.extra_data['home_point_status'] = bool(msg.data)
@@ -514,10 +787,10 @@ class GPSLogger:
         self.extra_data['home_point_altitude'] = msg.data
 
     def _rtk_position_callback(self, msg: NavSatFix):
-        self.extra_data['rtk_position'] = [msg.latitude, msg.longitude, msg.altitude]
+        self.extra_data['rtk_position'] = (msg.latitude, msg.longitude, msg.altitude)
 
     def _rtk_velocity_callback(self, msg: TwistStamped):
-        self.extra_data['rtk_velocity'] = [msg.twist.linear.x, msg.twist.linear.y, msg.twist.linear.z]
+        self.extra_data['rtk_velocity'] = (msg.twist.linear.x, msg.twist.linear.y, msg.twist.linear.z)
 
     def _rtk_connection_callback(self, msg: UInt16):
         self.extra_data['rtk_connection_status'] = msg.data
@@ -529,160 +802,288 @@ class GPSLogger:
         self.extra_data['display_mode'] = msg.display_mode
 
     def _control_mode_callback(self, msg: ControlMode):
-        self.extra_data['psdk_control'] = {
-            'control_mode': msg.control_mode,
-            'device_mode': msg.device_mode,
-            'control_auth': msg.control_auth,
-        }
+        self.extra_data['psdk_control'] = ControlModeSnapshot(
+            msg.control_mode, msg.device_mode, msg.control_auth,
+        )
 
     def _flight_status_callback(self, msg: FlightStatus):
         self.extra_data['flight_status'] = msg.flight_status
 
     def _flight_anomaly_callback(self, msg: FlightAnomaly):
-        flags = []
-        for field in [
-            'impact_in_air', 'random_fly', 'height_ctrl_fail', 'roll_pitch_ctrl_fail',
-            'yaw_ctrl_fail', 'aircraft_is_falling', 'strong_wind_level1', 'strong_wind_level2',
-            'compass_installation_error', 'imu_installation_error', 'esc_temperature_high',
-            'at_least_one_esc_disconnected', 'gps_yaw_error'
-        ]:
-            if getattr(msg, field, 0):
-                flags.append(field)
+        try:
+            bits = _FLIGHT_ANOMALY_GETTER(msg)
+        except AttributeError:
+            # 旧版消息定义可能缺少部分字段，缺失字段按 0 处理
+            bits = tuple(getattr(msg, field, 0) for field in FLIGHT_ANOMALY_FIELDS)
+        # 异常标志未变化时沿用上次拼接好的字符串
+        if bits == self._last_anomaly_bits:
+            return
+        self._last_anomaly_bits = bits
+        flags = [field for field, value in zip(FLIGHT_ANOMALY_FIELDS, bits) if value]
         self.extra_data['flight_anomaly_flags'] = '|'.join(flags) if flags else 'none'
 
     def _rc_callback(self, msg: Joy):
-        axes = list(msg.axes)
-        buttons = list(msg.buttons)
-        self.extra_data['rc_axes'] = axes
-        self.extra_data['rc_buttons'] = buttons
+        # rclpy 中 axes/buttons 已是 array.array，每条消息都是新对象，直接保存无需复制
+        self.extra_data['rc_axes'] = msg.axes
+        self.extra_data['rc_buttons'] = msg.buttons
 
     def _rc_status_callback(self, msg: RCConnectionStatus):
-        self.extra_data['rc_link'] = {
-            'air': msg.air_connection,
-            'ground': msg.ground_connection,
-            'app': msg.app_connection,
-            'disconnected': msg.air_or_ground_disconnected,
-        }
+        self.extra_data['rc_link'] = RCLinkSnapshot(
+            msg.air_connection,
+            msg.ground_connection,
+            msg.app_connection,
+            msg.air_or_ground_disconnected,
+        )
 
     def _battery_callback(self, msg: SingleBatteryInfo, idx: str):
-        self.extra_data[idx] = {
-            'voltage': msg.voltage,
-            'current': msg.current,
-            'capacity_remain': msg.capacity_remain,
-            'capacity_pct': msg.capacity_percentage,
-            'temperature': msg.temperature,
-        }
+        self.extra_data[idx] = BatterySnapshot(
+            msg.voltage,
+            msg.current,
+            msg.capacity_remain,
+            msg.capacity_percentage,
+            msg.temperature,
+        )
 
     def _esc_callback(self, msg: EscData):
-        if not msg.esc:
+        escs = msg.esc
+        if not escs:
             return
-        currents = [entry.current for entry in msg.esc]
-        voltages = [entry.voltage for entry in msg.esc]
-        temperatures = [entry.temperature for entry in msg.esc]
-        self.extra_data['esc_stats'] = {
-            'avg_current': sum(currents) / len(currents) if currents else math.nan,
-            'avg_voltage': sum(voltages) / len(voltages) if voltages else math.nan,
-            'avg_temperature': sum(temperatures) / len(temperatures) if temperatures else math.nan,
-            'max_temperature': max(temperatures) if temperatures else math.nan,
-        }
+        # 单次遍历同时累加电流/电压/温度并记录最高温度
+        current_sum = voltage_sum = temperature_sum = 0.0
+        max_temperature = -math.inf
+        for entry in escs:
+            current_sum += entry.current
+            voltage_sum += entry.voltage
+            temperature = entry.temperature
+            temperature_sum += temperature
+            if temperature > max_temperature:
+                max_temperature = temperature
+        inv_count = 1.0 / len(escs)
+        self.extra_data['esc_stats'] = EscStatsSnapshot(
+            current_sum * inv_count,
+            voltage_sum * inv_count,
+            temperature_sum * inv_count,
+            max_temperature,
+        )
 
     def _relative_obstacle_callback(self, msg: RelativeObstacleInfo):
-        self.extra_data['relative_obstacle'] = {
-            'up': msg.up,
-            'down': msg.down,
-            'front': msg.front,
-            'back': msg.back,
-            'left': msg.left,
-            'right': msg.right,
-            'up_health': msg.up_health,
-            'down_health': msg.down_health,
-            'front_health': msg.front_health,
-            'back_health': msg.back_health,
-            'left_health': msg.left_health,
-            'right_health': msg.right_health,
-        }
+        self.extra_data['relative_obstacle'] = RelativeObstacleSnapshot(
+            msg.up, msg.down, msg.front, msg.back, msg.left, msg.right,
+            msg.up_health, msg.down_health, msg.front_health,
+            msg.back_health, msg.left_health, msg.right_health,
+        )
 
     def _hms_table_callback(self, msg: HmsInfoTable):
-        summaries = []
-        for entry in msg.table:
-            if entry.error_code:
-                summaries.append(f"{entry.error_code}:{entry.error_level}")
-        self.extra_data['hms_error_summary'] = ';'.join(summaries) if summaries else ''
+        signature = tuple(
+            (entry.error_code, entry.error_level) for entry in msg.table if entry.error_code
+        )
+        # HMS 表通常长时间不变，只有内容变化时才重新拼接摘要字符串
+        if signature == self._last_hms_signature:
+            return
+        self._last_hms_signature = signature
+        self.extra_data['hms_error_summary'] = ';'.join(f"{code}:{level}" for code, level in signature)
+
+
+def _parse_bool(value: str) -> bool:
+    # 只接受明确的布尔值，避免把误写成取值的下一个选项(如 -v -d)当作 False
+    lowered = value.lower()
+    if lowered in ("true", "yes", "1"):
+        return True
+    if lowered in ("false", "no", "0"):
+        return False
+    raise ValueError(f"无效的布尔值: {value}")
 
 
-def parse_args() -> Dict[str, Any]:
+def _parse_log_format(value: str) -> str:
+    if value not in ("csv", "arrow", "bin"):
+        raise ValueError(f"不支持的日志格式: {value}")
+    return value
+
+
+def _flag(value: str) -> bool:
+    return True
+
+
+# --help 输出，模块加载时即为完整常量，一次写出
+_HELP_TEXT = """\
+GPS数据记录器 - 无人机UDP通信测试系统
+
+使用方法: gps.py [选项]
+
+选项:
+  -d, --drone-id=ID       无人机命名空间 (默认: drone0)
+      --log-path=PATH     日志保存路径 (默认: ./logs)
+  -i, --interval=SEC      记录间隔(秒) (默认: 1.0)
+  -t, --time=SEC          最长运行时间(秒) (默认: 3600)
+      --sim-time          使用仿真时间
+  -v, --verbose=BOOL      详细输出 (默认: True)
+      --log-format=FMT    日志格式 csv/arrow/bin (默认: csv，arrow 需安装 pyarrow)
+      --skip-unchanged    无新话题数据且无人机状态未变化时不写入新行
+  -h, --help              显示帮助信息
+
+示例:
+  python3 gps.py --drone-id=drone0 --interval=0.5 --time=300
+  python3 gps.py --log-path=./test_logs --sim-time
+"""
+
+# 命令行选项 -> (配置键, 取值转换函数, 是否需要参数)
+_OPTION_HANDLERS = {
+    "-d": ("drone_id", str, True),
+    "--drone-id": ("drone_id", str, True),
+    "--log-path": ("log_path", str, True),
+    "-i": ("log_interval", float, True),
+    "--interval": ("log_interval", float, True),
+    "-t": ("running_time", int, True),
+    "--time": ("running_time", int, True),
+    "--sim-time": ("use_sim_time", _flag, False),
+    "-v": ("verbose", _parse_bool, True),
+    "--verbose": ("verbose", _parse_bool, True),
+    "--log-format": ("log_format", _parse_log_format, True),
+    "--skip-unchanged": ("skip_unchanged", _flag, False),
+}
+# 全部长选项，用于与 getopt 一致的唯一前缀匹配
+_LONG_OPTIONS = tuple(flag for flag in _OPTION_HANDLERS if flag.startswith("--")) + ("--help",)
+
+
+def _resolve_long_option(flag: str) -> str:
+    """
+    将长选项的唯一前缀(如 --drone、--int)展开为完整选项名，规则与 getopt 相同
+    """
+    if flag in _LONG_OPTIONS:
+        return flag
+    matches = [option for option in _LONG_OPTIONS if option.startswith(flag)]
+    if not matches:
+        raise ValueError(f"option {flag} not recognized")
+    if len(matches) > 1:
+        raise ValueError(f"option {flag} not a unique prefix")
+    return matches[0]
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> Mapping[str, Any]:
     """
     解析命令行参数（与UDP测试系统保持一致的参数格式）
+    Args:
+        argv: 参数列表，默认使用 sys.argv[1:]
     Returns:
-        包含配置参数的字典
+        包含配置参数的只读映射（相同参数的解析结果会被缓存复用）
     """
+    return _parse_args_cached(tuple(sys.argv[1:] if argv is None else argv))
+
+
+@lru_cache(maxsize=8)
+def _parse_args_cached(args: Tuple[str, ...]) -> Mapping[str, Any]:
     config = DEFAULT_CONFIG.copy()
+    idx = 0
     
     try:
-        opts, _ = getopt.getopt(
-            sys.argv[1:],
-            "hd:i:t:v",
-            ["drone-id=", "log-path=", "interval=", "time=", "sim-time", "verbose=", "help"]
-        )
-        
-        for opt, arg in opts:
-            if opt in ("-h", "--help"):
-                print("GPS数据记录器 - 无人机UDP通信测试系统")
-                print("")
-                print("使用方法: gps.py [选项]")
-                print("")
-                print("选项:")
-                print("  -d, --drone-id=ID       无人机命名空间 (默认: drone0)")
-                print("      --log-path=PATH     日志保存路径 (默认: ./logs)")
-                print("  -i, --interval=SEC      记录间隔(秒) (默认: 1.0)")
-                print("  -t, --time=SEC          最长运行时间(秒) (默认: 3600)")
-                print("      --sim-time          使用仿真时间")
-                print("  -v, --verbose=BOOL      详细输出 (默认: True)")
-                print("  -h, --help              显示帮助信息")
-                print("")
-                print("示例:")
-                print("  python3 gps.py --drone-id=drone0 --interval=0.5 --time=300")
-                print("  python3 gps.py --log-path=./test_logs --sim-time")
-                sys.exit()
-            elif opt in ("-d", "--drone-id"):
-                config["drone_id"] = arg
-            elif opt == "--log-path":
-                config["log_path"] = arg
-            elif opt in ("-i", "--interval"):
-                config["log_interval"] = float(arg)
-            elif opt in ("-t", "--time"):
-                config["running_time"] = int(arg)
-            elif opt == "--sim-time":
-                config["use_sim_time"] = True
-            elif opt in ("-v", "--verbose"):
-                config["verbose"] = arg.lower() in ("true", "yes", "1")
+        while idx < len(args):
+            token = args[idx]
+            idx += 1
+            # 与 getopt 一致：遇到 "--" 或第一个非选项参数时停止解析
+            if token == "--" or not token.startswith("-") or token == "-":
+                break
+            if token.startswith("--"):
+                flag, sep, value = token.partition("=")
+                options = [(_resolve_long_option(flag), value if sep else None)]
+            else:
+                # 与 getopt 一致，短选项可以合并书写：需要参数的选项取本参数剩余部分(如 -ddrone7)，为空时取下一个参数
+                options = []
+                pos = 1
+                while pos < len(token):
+                    flag = "-" + token[pos]
+                    pos += 1
+                    handler = _OPTION_HANDLERS.get(flag)
+                    if handler is not None and handler[2] and pos < len(token):
+                        options.append((flag, token[pos:]))
+                        break
+                    options.append((flag, None))
+            
+            for flag, value in options:
+                if flag in ("-h", "--help"):
+                    sys.stdout.write(_HELP_TEXT)
+                    sys.exit(0)
+                
+                handler = _OPTION_HANDLERS.get(flag)
+                if handler is None:
+                    raise ValueError(f"option {flag} not recognized")
+                key, convert, needs_value = handler
+                if needs_value and value is None:
+                    if idx >= len(args):
+                        raise ValueError(f"option {flag} requires argument")
+                    value = args[idx]
+                    idx += 1
+                elif value is not None and not needs_value:
+                    raise ValueError(f"option {flag} must not have an argument")
+                config[key] = convert(value)
     
-    except getopt.GetoptError as e:
+    except ValueError as e:
         print(f"参数解析错误: {e}")
         print("使用 --help 查看帮助信息")
         sys.exit(2)
     
-    return config
+    # 缓存的结果被多个调用方共享，返回只读视图防止被修改
+    return MappingProxyType(config)
+
+
+# 同一进程中多个记录器线程共享 rclpy 上下文：由引用计数决定初始化和关闭的时机
+_RCLPY_LOCK = threading.Lock()
+_rclpy_users = 0
+_rclpy_owned = False
+
+
+def _acquire_rclpy() -> None:
+    """
+    登记一个 rclpy 使用者；第一个使用者在上下文未初始化时调用 rclpy.init()
+    """
+    global _rclpy_users, _rclpy_owned
+    with _RCLPY_LOCK:
+        if _rclpy_users == 0 and not rclpy.ok():
+            rclpy.init()
+            _rclpy_owned = True
+        _rclpy_users += 1
+
 
+def _release_rclpy() -> None:
+    """
+    注销一个 rclpy 使用者；最后一个使用者退出时关闭由本模块初始化的上下文，
+    调用方（启动器）自行初始化的上下文不关闭
+    """
+    global _rclpy_users, _rclpy_owned
+    with _RCLPY_LOCK:
+        _rclpy_users -= 1
+        if _rclpy_users == 0 and _rclpy_owned:
+            _rclpy_owned = False
+            rclpy.shutdown()
 
-def main():
-    """主函数"""
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """
+    主函数
+
+    Args:
+        argv: 命令行参数列表，默认使用 sys.argv[1:]；
+              在同一进程中组合运行多个记录器时可分别传入
+    """
     # 解析命令行参数
-    config = parse_args()
+    config = parse_args(argv)
     
-    # 初始化ROS 2
-    rclpy.init()
+    # 参数解析通过后再加载 ROS2 依赖并初始化；
+    # 同一进程中的多个记录器共享一个 rclpy 上下文（一个 DDS participant），最后一个退出时才关闭
+    _load_ros_dependencies()
+    _acquire_rclpy()
     
     try:
-        # 创建并运行GPS记录器
+        # 创建并运行GPS记录器；其它异常直接抛出并显示完整堆栈
         logger = GPSLogger(config)
         logger.run()
         
-    except Exception as e:
+    except (ImportError, OSError) as e:
+        # 可预期的启动失败：可选依赖缺失(如 arrow 格式未安装 pyarrow)、日志目录不可写等
         print(f"启动GPS记录器时出错: {e}")
+        sys.exit(1)
     finally:
         # 关闭ROS 2
-        rclpy.shutdown()
+        _release_rclpy()
 
 
 if __name__ == '__main__':
@@ -6,19 +6,39 @@ Nexfi通信模块状态记录器
 """
 
 import argparse
+import itertools
+import operator
 import requests
-import uuid
+from requests.adapters import HTTPAdapter
 import json
 import time
 import signal
 import sys
+import threading
 import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Callable, Dict, Iterable, List, Optional, Any, Tuple
 import logging
 
+from background_log import BackgroundLogWriter
 from resilient_csv import ResilientCsvWriter
 
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时使用标准库 json
+    orjson = None
+
+if orjson is not None:
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+else:
+    _json_loads = json.loads
+
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj).encode("utf-8")
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -34,9 +54,26 @@ DEFAULT_CONFIG = {
     "verbose": True,                 # 是否打印详细信息
     "device_name": "adhoc0",         # 网络设备名称
     "bat_interface": "bat0",        # batman-adv接口
+    "csv_flush_every": 10,           # 状态CSV每累计多少行刷新一次(拓扑边CSV为其5倍)
+    "csv_buffer_size": 1 << 17,      # CSV文件写缓冲区大小(字节)
+    "log_queue_size": 256,           # 后台写入队列长度(批)，队列满时丢弃新数据
+    "log_format": "csv",             # 日志格式: csv 或 arrow(Arrow IPC stream，列式，需要 pyarrow)
+    "topology_edges_dedup": False,   # 拓扑边(MAC/metric/snr/tx_rate)未变化时不重复写入拓扑边CSV
 }
 
-NEXFI_STATUS_CSV_HEADER = [
+# system.board 结果缓存时间(秒)
+BOARD_INFO_TTL_S = 600.0
+# 请求失败重试前的退避时间基数(秒)，第 i 次重试等待 RETRY_BACKOFF_BASE_S * 2**(i-1)
+RETRY_BACKOFF_BASE_S = 0.05
+# 未指定请求时间预算时的单次请求超时(秒)
+DEFAULT_REQUEST_TIMEOUT_S = 5.0
+# ubus 调用失败时，解析结果中携带错误信息的键
+_ERROR_KEY = "__error__"
+# mesh 接口 disabled 字段表示“已启用”的取值（小写字符串形式）
+_MESH_ENABLED_VALUES = frozenset(('0', 'false'))
+
+# CSV 表头为模块级只读元组，写入器直接引用而不复制
+NEXFI_STATUS_CSV_HEADER: Tuple[str, ...] = (
     'timestamp',           # 时间戳（Unix时间戳）
     'mesh_enabled',        # Mesh是否启用
     'channel',             # 信道号
@@ -89,9 +126,9 @@ NEXFI_STATUS_CSV_HEADER = [
     'firmware_version',    # 固件版本
     'topology_nodes',      # 拓扑中的节点数
     'link_quality',        # 平均链路质量
-]
+)
 
-NEXFI_TOPOLOGY_EDGES_CSV_HEADER = [
+NEXFI_TOPOLOGY_EDGES_CSV_HEADER: Tuple[str, ...] = (
     'timestamp',
     'router_mac',
     'router_ip',
@@ -102,8 +139,162 @@ NEXFI_TOPOLOGY_EDGES_CSV_HEADER = [
     'metric',
     'tx_rate',
     'snr',
-    'last_seen'
-]
+    'last_seen',
+)
+
+# Arrow 输出时按字符串/布尔保存的列，其余列按 float64 保存（无法解析的值记为 NaN）
+NEXFI_STATUS_ARROW_STRING_COLUMNS: Tuple[str, ...] = (
+    'frequency_band', 'work_mode', 'node_id', 'node_ip', 'wifi_mode', 'channel_width',
+    'connected_node_id', 'connected_node_mac', 'connected_node_ip', 'last_seen',
+    'mesh_plink', 'mesh_llid', 'mesh_plid', 'mesh_local_ps', 'mesh_peer_ps', 'mesh_non_peer_ps',
+    'throughput', 'cpu_usage', 'memory_usage', 'bat_ipv4', 'bat_ipv6', 'uptime', 'firmware_version',
+)
+NEXFI_STATUS_ARROW_BOOL_COLUMNS: Tuple[str, ...] = ('mesh_enabled',)
+NEXFI_TOPOLOGY_EDGES_ARROW_STRING_COLUMNS: Tuple[str, ...] = (
+    'router_mac', 'router_ip', 'router_nodeid', 'neighbor_mac', 'neighbor_ip', 'neighbor_nodeid', 'last_seen',
+)
+
+
+def _optional_float(value: Any) -> Optional[float]:
+    """空值或无法解析时返回 None，否则转换为 float"""
+    # JSON 解码后的数值字段已是 float/int，直接返回，不进入异常处理路径
+    cls = value.__class__
+    if cls is float:
+        return value
+    if cls is int:
+        return float(value)
+    try:
+        if value in (None, ''):
+            return None
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _csv_field(value: Any) -> str:
+    """按 csv.writer 默认方言（QUOTE_MINIMAL）的规则格式化单个字段"""
+    if value is None:
+        return ''
+    text = value if isinstance(value, str) else str(value)
+    if ',' in text or '"' in text or '\n' in text or '\r' in text:
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def _csv_join(values: Iterable[Any]) -> str:
+    return ','.join(map(_csv_field, values))
+
+
+def _float_projector(keys: Tuple[str, ...]) -> Callable[[Dict[str, Any]], List[Optional[float]]]:
+    """生成 project(source) -> [各键对应的 float 或 None]；已是 float 的值直接使用，不再经过转换函数"""
+    def project(source: Dict[str, Any]) -> List[Optional[float]]:
+        get = source.get
+        values = []
+        for key in keys:
+            value = get(key)
+            values.append(value if value.__class__ is float else _optional_float(value))
+        return values
+
+    return project
+
+
+# 拓扑邻居条目中的数值字段：metric, tx_rate, snr
+_neighbor_floats = _float_projector(('metric', 'tx_rate', 'snr'))
+
+
+# 原始 MAC 字符串 -> 规范化(小写、驻留)结果；缓存大小受实际节点数限制
+_mac_cache: Dict[str, str] = {}
+
+
+def _canon_mac(value: Any) -> str:
+    """把 MAC 地址规范化为小写并驻留，同一原始字符串只转换一次"""
+    if not isinstance(value, str):
+        return str(value).lower()
+    mac = _mac_cache.get(value)
+    if mac is None:
+        mac = _mac_cache[value] = sys.intern(value.lower())
+    return mac
+
+
+def _field_extractor(fields: Tuple[Tuple[str, str], ...]):
+    """
+    根据 (记录键, 原始字段名) 列表生成提取函数 extract(source) -> [(记录键, 值), ...]
+
+    先与全 None 的默认字典合并再用 itemgetter 一次取出全部字段，缺失字段为 None。
+    """
+    columns = tuple(column for column, _ in fields)
+    defaults = dict.fromkeys(raw for _, raw in fields)
+    getter = operator.itemgetter(*(raw for _, raw in fields))
+
+    def extract(source: Dict[str, Any]):
+        return zip(columns, getter({**defaults, **source}))
+
+    return extract
+
+
+# iwinfo assoclist 条目中需要记录的字段
+_extract_assoc_fields = _field_extractor((
+    ('thr', 'thr'),
+    ('mesh_plink', 'mesh plink'),
+    ('mesh_llid', 'mesh llid'),
+    ('mesh_plid', 'mesh plid'),
+    ('mesh_local_ps', 'mesh local PS'),
+    ('mesh_peer_ps', 'mesh peer PS'),
+    ('mesh_non_peer_ps', 'mesh non-peer PS'),
+))
+_extract_tx_fields = _field_extractor((
+    ('tx_packets', 'packets'),
+    ('tx_bytes', 'bytes'),
+    ('tx_retries', 'retries'),
+    ('tx_rate_curr', 'rate'),
+))
+_extract_rx_fields = _field_extractor((
+    ('rx_packets', 'packets'),
+    ('rx_bytes', 'bytes'),
+    ('rx_drop_misc', 'drop_misc'),
+))
+
+
+@dataclass(slots=True)
+class NodeEntry:
+    """一个已连接站点在本次采样中的信息（assoclist 字段 + 拓扑匹配结果）"""
+    macaddr: str
+    rssi: float
+    snr: float
+    raw: Dict[str, Any] = field(default_factory=dict)
+    thr: Any = None
+    mesh_plink: Any = None
+    mesh_llid: Any = None
+    mesh_plid: Any = None
+    mesh_local_ps: Any = None
+    mesh_peer_ps: Any = None
+    mesh_non_peer_ps: Any = None
+    tx_packets: Any = None
+    tx_bytes: Any = None
+    tx_retries: Any = None
+    tx_rate_curr: Any = None
+    rx_packets: Any = None
+    rx_bytes: Any = None
+    rx_drop_misc: Any = None
+    # 以下字段来自拓扑信息
+    nodeid: Any = None
+    ipaddr: Any = None
+    link_metric: Optional[float] = None
+    tx_rate: Optional[float] = None
+    topology_snr: Optional[float] = None
+    last_seen: Any = None
+
+
+# 状态CSV中逐节点变化的列（connected_node_id ... mesh_non_peer_ps）对应的 NodeEntry 属性
+_NODE_ROW_FIELDS: Tuple[str, ...] = (
+    'nodeid', 'macaddr', 'ipaddr', 'rssi', 'snr', 'topology_snr', 'link_metric', 'tx_rate', 'last_seen', 'thr',
+    'tx_packets', 'tx_bytes', 'tx_retries', 'rx_packets', 'rx_bytes', 'rx_drop_misc',
+    'mesh_plink', 'mesh_llid', 'mesh_plid', 'mesh_local_ps', 'mesh_peer_ps', 'mesh_non_peer_ps',
+)
+_node_row_values = operator.attrgetter(*_NODE_ROW_FIELDS)
+# 没有连接节点时，节点列全部留空
+_EMPTY_NODE_COLUMNS = ',' * (len(_NODE_ROW_FIELDS) - 1)
+_EMPTY_NODE_VALUES = (None,) * len(_NODE_ROW_FIELDS)
 
 
 class NexfiClient:
@@ -116,6 +307,7 @@ class NexfiClient:
         password: str = "nexfi",
         device_name: str = "adhoc0",
         bat_interface: str = "bat0",
+        request_budget_s: Optional[float] = None,
     ):
         """
         初始化Nexfi客户端
@@ -124,6 +316,8 @@ class NexfiClient:
             api_url (str): Nexfi设备的IP地址，默认为192.168.104.1
             username (str): 登录用户名，默认为root
             password (str): 登录密码，默认为nexfi
+            request_budget_s (Optional[float]): 单个接口调用(含重试)的时间预算，通常取记录间隔；
+                None 表示不限制，单次请求超时 DEFAULT_REQUEST_TIMEOUT_S 秒
         """
         self.api_url = f"http://{api_url}/ubus"
         self.username = username
@@ -131,40 +325,109 @@ class NexfiClient:
         self.session = None
         self.device_name = device_name
         self.bat_interface = bat_interface
+        self._request_budget_s = request_budget_s
+        if request_budget_s is None:
+            self._request_timeout_s = DEFAULT_REQUEST_TIMEOUT_S
+        else:
+            self._request_timeout_s = min(DEFAULT_REQUEST_TIMEOUT_S, max(0.5, request_budget_s * 0.8))
+        # 各状态接口相互独立，并发请求使每轮耗时接近单次往返而不是多次往返之和；
+        # 候选设备探测使用单独的线程池，避免与外层状态请求互相占满线程而死锁
+        self._status_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="nexfi-status")
+        self._probe_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="nexfi-probe")
+        # 复用 keep-alive 连接，避免每次请求重新建立 TCP 连接；连接池大小覆盖两个线程池的并发数
+        self._http = requests.Session()
+        self._http.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=8, max_retries=0))
+        self._http.headers.update({"Connection": "keep-alive", "Content-Type": "application/json"})
+        # 设备返回非数组响应时置为 False，之后不再尝试批量请求
+        self._batch_supported = True
+        # 固件/内核信息重启前不会变化，缓存 BOARD_INFO_TTL_S 秒
+        self._board_info_cache: Optional[Dict[str, Any]] = None
+        self._board_info_ts = 0.0
+        # 各类探测上一次成功的设备名，下次优先只探测该设备
+        self._preferred_devices: Dict[str, str] = {}
+        self._candidate_devices_cache: Optional[List[str]] = None
+        self._login_body: Optional[bytes] = None
+        # JSON-RPC 请求 id 只需在本客户端内唯一即可匹配响应；登录固定使用 1，
+        # itertools.count 的 next() 在线程池中并发调用也是安全的
+        self._request_ids = itertools.count(2)
         self._login()
+
+    def _post(self, payload: Any, timeout: float) -> requests.Response:
+        """
+        发送 JSON-RPC 请求体；序列化在本地完成（有 orjson 时使用 orjson）
+
+        payload 为已序列化的 bytes 时直接发送，便于重试和重复登录时复用同一份请求体。
+        """
+        body = payload if isinstance(payload, bytes) else _json_dumps(payload)
+        return self._http.post(self.api_url, data=body, timeout=timeout)
+
+    @staticmethod
+    def _response_json(response: requests.Response) -> Any:
+        return _json_loads(response.content)
+
+    def close(self) -> None:
+        """释放并发请求使用的线程池和 HTTP 连接"""
+        self._status_pool.shutdown(wait=False, cancel_futures=True)
+        self._probe_pool.shutdown(wait=False, cancel_futures=True)
+        self._http.close()
     
     def _candidate_devices(self) -> List[str]:
-        candidates = [self.device_name, "mesh0", "adhoc0", "wlan0"]
-        seen = set()
-        ordered = []
-        for dev in candidates:
-            if dev and dev not in seen:
-                seen.add(dev)
-                ordered.append(dev)
-        return ordered
+        if self._candidate_devices_cache is None:
+            candidates = [self.device_name, "mesh0", "adhoc0", "wlan0"]
+            # 去重并保持优先顺序；设备名在客户端生命周期内不变，只计算一次
+            self._candidate_devices_cache = [dev for dev in dict.fromkeys(candidates) if dev]
+        return self._candidate_devices_cache
+
+    def _probe_devices(self, kind: str, probe: Callable[[str], Optional[Any]]) -> Optional[Tuple[str, Any]]:
+        """
+        探测候选设备，返回第一个有效结果 (设备名, 结果)
+
+        上次探测成功的设备优先单独尝试；失败时再并发探测其余候选设备，按候选顺序取第一个有效结果。
+        """
+        preferred = self._preferred_devices.get(kind)
+        if preferred:
+            result = probe(preferred)
+            if result is not None:
+                return preferred, result
+            self._preferred_devices.pop(kind, None)
+
+        devices = [dev for dev in self._candidate_devices() if dev != preferred]
+        futures = [self._probe_pool.submit(probe, dev) for dev in devices]
+        try:
+            for dev, future in zip(devices, futures):
+                result = future.result()
+                if result is not None:
+                    self._preferred_devices[kind] = dev
+                    return dev, result
+            return None
+        finally:
+            for future in futures:
+                future.cancel()
 
     @staticmethod
     def _is_error_response(result: Optional[Dict[str, Any]]) -> bool:
-        return isinstance(result, dict) and "__error__" in result
+        return isinstance(result, dict) and _ERROR_KEY in result
     
     def _login(self) -> None:
         """登录并获取会话ID"""
-        payload = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "call",
-            "params": [
-                "00000000000000000000000000000000",
-                "session",
-                "login",
-                {"username": self.username, "password": self.password},
-            ],
-        }
+        # 登录请求体只与用户名/密码有关，序列化一次后在重新登录时复用
+        if self._login_body is None:
+            self._login_body = _json_dumps({
+                "jsonrpc": "2.0",
+                "id": 1,
+                "method": "call",
+                "params": [
+                    "00000000000000000000000000000000",
+                    "session",
+                    "login",
+                    {"username": self.username, "password": self.password},
+                ],
+            })
         
         try:
-            response = requests.post(self.api_url, json=payload, timeout=10)
+            response = self._post(self._login_body, timeout=10)
             if response.status_code == 200:
-                result = response.json()
+                result = self._response_json(response)
                 if "result" in result and len(result["result"]) > 1:
                     self.session = result["result"][1]["ubus_rpc_session"]
                     logger.info("Successfully logged in to Nexfi device")
@@ -192,14 +455,15 @@ class NexfiClient:
             stripped = stdout_content.strip()
             if stripped:
                 try:
-                    parsed = json.loads(stripped)
+                    parsed = _json_loads(stripped)
                     combined = dict(payload)
                     if isinstance(parsed, dict):
                         combined.update(parsed)
                     combined["stdout_parsed"] = parsed
                     return combined
-                except json.JSONDecodeError:
-                    logger.debug("Failed to parse stdout JSON snippet: %s", stripped[:120])
+                except ValueError:
+                    if logger.isEnabledFor(logging.DEBUG):
+                        logger.debug("Failed to parse stdout JSON snippet: %s", stripped[:120])
         return payload
     
     def _parse_json_string(self, raw: str) -> Optional[Any]:
@@ -209,20 +473,25 @@ class NexfiClient:
         if not stripped:
             return None
         try:
-            return json.loads(stripped)
-        except json.JSONDecodeError:
-            logger.debug("Failed to decode JSON string: %s", stripped[:120])
+            return _json_loads(stripped)
+        except ValueError:
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Failed to decode JSON string: %s", stripped[:120])
             return None
 
     def _extract_result_payload(self, response_json: Dict[str, Any]) -> Optional[Any]:
         if "error" in response_json:
-            return {"__error__": response_json["error"]}
+            return {_ERROR_KEY: response_json["error"]}
 
         payload = response_json.get("result")
         if payload is None:
             return None
 
         if isinstance(payload, list):
+            # 绝大多数成功响应都是 [0, {...}]，直接处理，不进入下面的通用分支
+            if len(payload) == 2 and payload[0] == 0 and isinstance(payload[1], dict):
+                return self._normalize_response_payload(payload[1])
+
             # ubus responses typically look like: [status_code, payload]
             # - status_code == 0: success
             # - status_code != 0: error (payload may be a string/dict or absent)
@@ -239,7 +508,7 @@ class NexfiClient:
                             details = second
                         elif second is not None:
                             message = str(second)
-                    return {"__error__": {"code": status_code, "message": message, "details": details}}
+                    return {_ERROR_KEY: {"code": status_code, "message": message, "details": details}}
 
                 if len(payload) == 1:
                     return {}
@@ -291,14 +560,24 @@ class NexfiClient:
         }
         return self._make_request("file", "exec", payload)
 
+    def _get_board_info(self) -> Dict[str, Any]:
+        """获取 system.board（固件版本等），成功结果缓存 BOARD_INFO_TTL_S 秒"""
+        now = time.monotonic()
+        if self._board_info_cache is not None and now - self._board_info_ts < BOARD_INFO_TTL_S:
+            return self._board_info_cache
+        board_info = self._make_request("system", "board")
+        if not board_info or self._is_error_response(board_info):
+            return {}
+        self._board_info_cache = board_info
+        self._board_info_ts = now
+        return board_info
+
     def _get_system_status_fallback(self) -> Dict[str, Any]:
         system_info = self._make_request("system", "info")
-        board_info = self._make_request("system", "board")
+        board_info = self._get_board_info()
 
         if self._is_error_response(system_info):
             system_info = {}
-        if self._is_error_response(board_info):
-            board_info = {}
 
         load_avg = system_info.get("load", [])
         def _format_load(value):
@@ -340,23 +619,20 @@ class NexfiClient:
             "mem_cached": memory.get("cached"),
         }
 
-    def _get_mesh_info_fallback(self) -> Dict[str, Any]:
-        wifi_info: Optional[Dict[str, Any]] = None
-        device_used = None
-        for dev in self._candidate_devices():
-            response = self._make_request("iwinfo", "info", {"device": dev})
-            if not isinstance(response, dict) or self._is_error_response(response):
-                continue
-            # iwinfo.info 正常应返回包含基本无线字段的字典
-            if not any(key in response for key in ("mode", "channel", "bssid", "quality", "quality_max")):
-                continue
-            if response:
-                wifi_info = response
-                device_used = dev
-                break
+    def _probe_wifi_info(self, dev: str) -> Optional[Dict[str, Any]]:
+        response = self._make_request("iwinfo", "info", {"device": dev})
+        if not isinstance(response, dict) or _ERROR_KEY in response:
+            return None
+        # iwinfo.info 正常应返回包含基本无线字段的字典
+        if not any(key in response for key in ("mode", "channel", "bssid", "quality", "quality_max")):
+            return None
+        return response or None
 
-        if not wifi_info:
+    def _get_mesh_info_fallback(self) -> Dict[str, Any]:
+        probed = self._probe_devices("info", self._probe_wifi_info)
+        if not probed:
             return {}
+        device_used, wifi_info = probed
 
         interface_name = self.bat_interface or "bat0"
         network_info = self._make_request(f"network.interface.{interface_name}", "status")
@@ -405,22 +681,25 @@ class NexfiClient:
         if isinstance(signal, (int, float)) and isinstance(noise, (int, float)):
             snr = signal - noise
         return {
-            "primary": entry.get("mac", "").lower(),
+            "primary": _canon_mac(entry.get("mac", "")),
             "rssi": signal,
             "snr": snr,
             "device": device,
             "raw": entry,
         }
 
+    def _probe_assoclist(self, dev: str) -> Optional[List[Dict[str, Any]]]:
+        response = self._make_request("iwinfo", "assoclist", {"device": dev})
+        if not isinstance(response, dict) or not response or _ERROR_KEY in response:
+            return None
+        result_list = response.get("results")
+        if isinstance(result_list, list) and result_list:
+            return [self._format_assoc_entry(entry, dev) for entry in result_list]
+        return None
+
     def _get_connected_nodes_fallback(self) -> List[Dict[str, Any]]:
-        for dev in self._candidate_devices():
-            response = self._make_request("iwinfo", "assoclist", {"device": dev})
-            if not isinstance(response, dict) or not response or self._is_error_response(response):
-                continue
-            result_list = response.get("results")
-            if isinstance(result_list, list) and result_list:
-                return [self._format_assoc_entry(entry, dev) for entry in result_list]
-        return []
+        probed = self._probe_devices("assoclist", self._probe_assoclist)
+        return probed[1] if probed else []
 
     def _get_network_topology_fallback(self) -> List[Dict[str, Any]]:
         response = self._call_file_exec("/usr/sbin/batadv-vis", ["-f", "jsondoc"])
@@ -455,72 +734,130 @@ class NexfiClient:
             Dict[str, Any]: API响应结果
         """
         params_dict: Dict[str, Any] = params if params is not None else {}
+        start = time.monotonic()
+        last_error: Optional[str] = None
+        # 请求体只序列化一次，重试时原样重发（HTTP 请求与响应一一对应，沿用同一个 id 不会混淆）
+        request_id = next(self._request_ids)
+        body = _json_dumps({
+            "jsonrpc": "2.0",
+            "id": request_id,
+            "method": "call",
+            "params": [self.session, service, method, params_dict],
+        })
             
         for i in range(max_retries):
-            request_id = str(uuid.uuid4())
-            payload = {
-                "jsonrpc": "2.0",
-                "id": request_id,
-                "method": "call",
-                "params": [self.session, service, method, params_dict],
-            }
+            if i:
+                # 重试前指数退避；超出时间预算时不再重试，避免拖慢记录节拍
+                backoff = RETRY_BACKOFF_BASE_S * (2 ** (i - 1))
+                if (
+                    self._request_budget_s is not None
+                    and time.monotonic() - start + backoff > self._request_budget_s
+                ):
+                    break
+                time.sleep(backoff)
             
             try:
-                response = requests.post(self.api_url, json=payload, timeout=5)
+                response = self._post(body, timeout=self._request_timeout_s)
                 
                 if response.status_code != 200:
-                    if i == max_retries - 1:
-                        logger.warning(f"Request failed with status code {response.status_code}")
+                    last_error = f"Request failed with status code {response.status_code}"
                     continue
                     
-                result = response.json()
+                result = self._response_json(response)
                 
                 if result.get("id") != request_id:
-                    if i == max_retries - 1:
-                        logger.warning(f"Request ID mismatch")
+                    last_error = "Request ID mismatch"
                     continue
                 
                 # 检查响应格式
                 payload = self._extract_result_payload(result)
                 if payload is not None:
                     return payload
-                if i == max_retries - 1:
-                    logger.warning(f"Invalid response format from {service}.{method}")
+                last_error = f"Invalid response format from {service}.{method}"
                 continue
                     
             except requests.exceptions.RequestException as e:
-                if i == max_retries - 1:
-                    logger.warning(f"Request failed: {e}")
+                last_error = f"Request failed: {e}"
                 continue
             except (KeyError, IndexError, TypeError, ValueError) as e:
-                if i == max_retries - 1:
-                    logger.warning(f"Invalid response format: {e}")
+                last_error = f"Invalid response format: {e}"
                 continue
         
+        if last_error:
+            logger.warning(last_error)
         # 返回空字典而不是抛出异常，保证记录器继续运行
         return {}
     
-    def get_system_status(self) -> Dict:
-        """获取系统状态"""
-        result = self._make_request("nexfi.system", "status")
+    def _make_batch_request(
+        self,
+        calls: List[Tuple[str, str, Optional[Dict[str, Any]]]],
+    ) -> Optional[List[Any]]:
+        """
+        以一个 JSON-RPC 批量请求发送多个 ubus 调用，按 id 对应回各调用的结果
+
+        Args:
+            calls: (service, method, params) 列表
+
+        Returns:
+            与 calls 顺序一致的结果列表；批量请求失败时返回 None，由调用方改为逐个请求
+        """
+        request_ids = [next(self._request_ids) for _ in calls]
+        payload = [
+            {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "method": "call",
+                "params": [self.session, service, method, params if params is not None else {}],
+            }
+            for request_id, (service, method, params) in zip(request_ids, calls)
+        ]
+
+        try:
+            response = self._post(payload, timeout=self._request_timeout_s)
+            if response.status_code != 200:
+                logger.debug("Batch request failed with status code %s", response.status_code)
+                return None
+            result = self._response_json(response)
+        except requests.exceptions.RequestException as e:
+            logger.debug("Batch request failed: %s", e)
+            return None
+        except ValueError as e:
+            logger.debug("Invalid batch response: %s", e)
+            return None
+
+        if not isinstance(result, list):
+            # 固件不支持批量请求，之后不再尝试
+            logger.info("Nexfi device does not support JSON-RPC batch requests, using individual requests")
+            self._batch_supported = False
+            return None
+
+        responses_by_id = {item.get("id"): item for item in result if isinstance(item, dict)}
+        results: List[Any] = []
+        for request_id, (service, method, params) in zip(request_ids, calls):
+            item = responses_by_id.get(request_id)
+            try:
+                extracted = self._extract_result_payload(item) if item is not None else None
+            except (KeyError, IndexError, TypeError, ValueError):
+                extracted = None
+            # 批量结果中缺失或格式异常的条目单独重试
+            results.append(extracted if extracted is not None else self._make_request(service, method, params))
+        return results
+
+    def _system_status_from(self, result: Any) -> Dict:
         if result and not self._is_error_response(result):
             return result
         return self._get_system_status_fallback()
-    
-    def get_mesh_info(self) -> Dict:
-        """获取Nexfi Mesh信息"""
-        result = self._make_request("nexfi.mesh", "status")
+
+    def _mesh_info_from(self, result: Any) -> Dict:
         if result and not self._is_error_response(result):
             return result
         return self._get_mesh_info_fallback()
-    
-    def get_connected_nodes(self, device: str = "adhoc0") -> List[Dict]:
-        """获取已连接站点列表"""
-        result = self._make_request("nexfi.mesh", "sites", {"device": device})
+
+    def _connected_nodes_from(self, result: Any) -> List[Dict]:
         candidates: List[Dict[str, Any]] = []
         if isinstance(result, list):
             candidates = result
-        elif isinstance(result, dict) and not self._is_error_response(result):
+        elif isinstance(result, dict) and _ERROR_KEY not in result:
             for key in ("results", "sites", "nodes", "data"):
                 value = result.get(key)
                 if isinstance(value, list):
@@ -531,13 +868,11 @@ class NexfiClient:
             return candidates
         return self._get_connected_nodes_fallback()
 
-    def get_network_topology(self) -> List[Dict]:
-        """获取网络拓扑"""
-        result = self._make_request("nexfi.mesh", "vis")
+    def _network_topology_from(self, result: Any) -> List[Dict]:
         if isinstance(result, list):
             return result
 
-        if isinstance(result, dict) and not self._is_error_response(result):
+        if isinstance(result, dict) and _ERROR_KEY not in result:
             if isinstance(result.get("vis"), list):
                 return result.get("vis", [])
             data_value = result.get("data")
@@ -545,6 +880,72 @@ class NexfiClient:
                 return data_value.get("vis", [])
         return self._get_network_topology_fallback()
 
+    def get_system_status(self) -> Dict:
+        """获取系统状态"""
+        return self._system_status_from(self._make_request("nexfi.system", "status"))
+    
+    def get_mesh_info(self) -> Dict:
+        """获取Nexfi Mesh信息"""
+        return self._mesh_info_from(self._make_request("nexfi.mesh", "status"))
+    
+    def get_connected_nodes(self, device: str = "adhoc0") -> List[Dict]:
+        """获取已连接站点列表"""
+        return self._connected_nodes_from(self._make_request("nexfi.mesh", "sites", {"device": device}))
+
+    def get_network_topology(self) -> List[Dict]:
+        """获取网络拓扑"""
+        return self._network_topology_from(self._make_request("nexfi.mesh", "vis"))
+
+    def get_all_status(self, device: str = "adhoc0",
+                       include_topology: bool = True) -> Tuple[Dict, Dict, List[Dict], List[Dict]]:
+        """
+        获取系统状态、Mesh信息、已连接站点和网络拓扑
+
+        各主接口合并为一个 JSON-RPC 批量请求（一次往返）；设备不支持批量请求时改为并发逐个请求。
+        需要走兼容回退接口的部分并发执行。
+
+        Args:
+            device: 查询已连接站点的网络设备名
+            include_topology: 为 False 时不请求网络拓扑（含其回退接口），返回的 topology 为空列表
+
+        Returns:
+            (system_status, mesh_info, connected_nodes, topology)
+        """
+        calls = [
+            ("nexfi.system", "status", None),
+            ("nexfi.mesh", "status", None),
+            ("nexfi.mesh", "sites", {"device": device}),
+        ]
+        if include_topology:
+            calls.append(("nexfi.mesh", "vis", None))
+
+        results = None
+        if self._batch_supported:
+            results = self._make_batch_request(calls)
+
+        if results is None:
+            futures = [
+                self._status_pool.submit(self.get_system_status),
+                self._status_pool.submit(self.get_mesh_info),
+                self._status_pool.submit(self.get_connected_nodes, device),
+            ]
+            if include_topology:
+                futures.append(self._status_pool.submit(self.get_network_topology))
+        else:
+            handlers = [
+                self._system_status_from,
+                self._mesh_info_from,
+                self._connected_nodes_from,
+                self._network_topology_from,
+            ]
+            futures = [
+                self._status_pool.submit(handler, result)
+                for handler, result in zip(handlers, results)
+            ]
+        system_status, mesh_info, connected_nodes, *rest = (future.result() for future in futures)
+        topology = rest[0] if rest else []
+        return system_status, mesh_info, connected_nodes, topology
+
 
 class NexfiStatusLogger:
     """Nexfi通信状态记录器类，集成到UDP通信测试系统"""
@@ -565,40 +966,89 @@ class NexfiStatusLogger:
         self.verbose = config.get("verbose", DEFAULT_CONFIG["verbose"])
         self.device_name = config.get("device_name", DEFAULT_CONFIG["device_name"])
         self.bat_interface = config.get("bat_interface", DEFAULT_CONFIG["bat_interface"])
+        csv_flush_every = max(1, int(config.get("csv_flush_every", DEFAULT_CONFIG["csv_flush_every"])))
+        csv_buffer_size = int(config.get("csv_buffer_size", DEFAULT_CONFIG["csv_buffer_size"]))
+        log_queue_size = int(config.get("log_queue_size", DEFAULT_CONFIG["log_queue_size"]))
+        self.log_format = config.get("log_format", DEFAULT_CONFIG["log_format"])
+        self.topology_edges_dedup = bool(config.get("topology_edges_dedup", DEFAULT_CONFIG["topology_edges_dedup"]))
         
-        self.running = True
+        # 停止事件：Ctrl+C 时置位，采样间隔的等待可被立即打断
+        self._stop = threading.Event()
+        # 上一次拓扑快照及其按 MAC 建立的索引；拓扑未变化时直接复用索引
+        self._last_topology: Optional[List[Dict[str, Any]]] = None
+        self._topology_by_mac: Dict[str, Dict[str, Any]] = {}
+        # 状态行中时间戳之后的共享字段及其格式化结果
+        self._status_prefix_values: Optional[Tuple[Any, ...]] = None
+        self._status_prefix = ''
+        # 上一次写入的拓扑边签名（仅 topology_edges_dedup 时使用）
+        self._last_edges_signature: Optional[Tuple[Any, ...]] = None
         
         # 确保日志目录存在
         os.makedirs(self.log_path, exist_ok=True)
         # 生成日志文件名（与UDP测试系统保持一致的命名格式）
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.log_file = os.path.join(self.log_path, f"nexfi_status_{timestamp}.csv")
-        self.topology_edges_file = os.path.join(self.log_path, f"typology_edges_{timestamp}.csv")
+        extension = "arrows" if self.log_format == "arrow" else "csv"
+        self.log_file = os.path.join(self.log_path, f"nexfi_status_{timestamp}.{extension}")
+        self.topology_edges_file = os.path.join(self.log_path, f"typology_edges_{timestamp}.{extension}")
         self.topology_edges_initialized = False
         self.topology_edges_disabled = False
-        self._status_csv = ResilientCsvWriter(
-            self.log_file,
-            header=NEXFI_STATUS_CSV_HEADER,
-            flush_every=10,
-            flush_interval_s=1.0,
-            inode_check_every=50,
-            inode_check_interval_s=1.0,
-            retry_base_interval_s=5.0,
-            retry_max_interval_s=60.0,
-            verbose=self.verbose,
-            label="NEXFI_STATUS",
+        # CSV 格式下行在采样线程中直接格式化为文本行；Arrow 格式下按行交给列式写入器
+        self._csv_lines = self.log_format != "arrow"
+        if self._csv_lines:
+            status_log = ResilientCsvWriter(
+                self.log_file,
+                header=NEXFI_STATUS_CSV_HEADER,
+                flush_every=csv_flush_every,
+                flush_interval_s=1.0,
+                inode_check_every=50,
+                inode_check_interval_s=1.0,
+                retry_base_interval_s=5.0,
+                retry_max_interval_s=60.0,
+                buffering=csv_buffer_size,
+                verbose=self.verbose,
+                label="NEXFI_STATUS",
+            )
+            edges_log = ResilientCsvWriter(
+                self.topology_edges_file,
+                header=NEXFI_TOPOLOGY_EDGES_CSV_HEADER,
+                flush_every=csv_flush_every * 5,
+                flush_interval_s=1.0,
+                inode_check_every=200,
+                inode_check_interval_s=2.0,
+                retry_base_interval_s=5.0,
+                retry_max_interval_s=60.0,
+                buffering=csv_buffer_size,
+                verbose=self.verbose,
+                label="NEXFI_EDGES",
+            )
+        else:
+            from arrow_log import ArrowStreamLogWriter
+
+            status_log = ArrowStreamLogWriter(
+                self.log_file,
+                header=NEXFI_STATUS_CSV_HEADER,
+                string_columns=NEXFI_STATUS_ARROW_STRING_COLUMNS,
+                bool_columns=NEXFI_STATUS_ARROW_BOOL_COLUMNS,
+                batch_rows=200,
+                flush_interval_s=5.0,
+                verbose=self.verbose,
+                label="NEXFI_STATUS",
+            )
+            edges_log = ArrowStreamLogWriter(
+                self.topology_edges_file,
+                header=NEXFI_TOPOLOGY_EDGES_CSV_HEADER,
+                string_columns=NEXFI_TOPOLOGY_EDGES_ARROW_STRING_COLUMNS,
+                batch_rows=1000,
+                flush_interval_s=5.0,
+                verbose=self.verbose,
+                label="NEXFI_EDGES",
+            )
+        # 文件写入都交给后台线程，采样节拍不受磁盘抖动影响；CSV 格式下每个节拍的全部行作为一个队列元素入队
+        self._status_csv = BackgroundLogWriter(
+            status_log, max_queue=log_queue_size, verbose=self.verbose, label="NEXFI_STATUS"
         )
-        self._topology_edges_csv = ResilientCsvWriter(
-            self.topology_edges_file,
-            header=NEXFI_TOPOLOGY_EDGES_CSV_HEADER,
-            flush_every=50,
-            flush_interval_s=1.0,
-            inode_check_every=200,
-            inode_check_interval_s=2.0,
-            retry_base_interval_s=5.0,
-            retry_max_interval_s=60.0,
-            verbose=self.verbose,
-            label="NEXFI_EDGES",
+        self._topology_edges_csv = BackgroundLogWriter(
+            edges_log, max_queue=log_queue_size, verbose=self.verbose, label="NEXFI_EDGES"
         )
         
         # 创建Nexfi客户端
@@ -612,10 +1062,13 @@ class NexfiStatusLogger:
                 self.password,
                 device_name=self.device_name,
                 bat_interface=self.bat_interface,
+                request_budget_s=self.log_interval,
             )
         except Exception as e:
             print(f"连接Nexfi设备失败: {e}")
             print("Nexfi状态记录器无法获取真实数据，将直接退出")
+            self._status_csv.close()
+            self._topology_edges_csv.close()
             raise
         
         # 初始化CSV文件
@@ -635,7 +1088,7 @@ class NexfiStatusLogger:
         """处理Ctrl+C信号"""
         if self.verbose:
             print("\n正在停止Nexfi状态记录...")
-        self.running = False
+        self._stop.set()
     
     def init_csv_file(self):
         """初始化CSV文件，写入表头（与UDP测试系统格式保持一致）"""
@@ -653,40 +1106,56 @@ class NexfiStatusLogger:
         if not self.topology_edges_initialized and self.verbose:
             print(f"创建拓扑边CSV文件失败: {self.topology_edges_file}，将在运行中自动重试")
     
-    def process_nexfi_data(self) -> Dict[str, Any]:
-        """处理Nexfi数据，提取关键指标"""
+    def _index_topology(self, topology: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """按小写 MAC 索引拓扑节点；与上一次快照内容相同时复用已有索引（索引只读）"""
+        if topology == self._last_topology:
+            return self._topology_by_mac
+        topology_by_mac: Dict[str, Dict[str, Any]] = {}
+        for topo_node in topology:
+            primary_value = topo_node.get('primary')
+            if not primary_value:
+                continue
+            topology_by_mac[_canon_mac(primary_value)] = topo_node
+        self._last_topology = topology
+        self._topology_by_mac = topology_by_mac
+        return topology_by_mac
+
+    def process_nexfi_data(self) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        处理Nexfi数据，提取关键指标
+
+        Returns:
+            (汇总指标字典, 拓扑快照列表)；拓扑快照单独返回，供写拓扑边使用，不放入汇总字典
+        """
         if not self.client:
             raise RuntimeError("Nexfi客户端未初始化，无法获取真实数据")
         
         try:
-            # 获取各种状态信息
-            system_status = self.client.get_system_status()
-            mesh_info = self.client.get_mesh_info()
-            connected_nodes = self.client.get_connected_nodes(self.device_name)
-            topology = self.client.get_network_topology()
-            topology_by_mac: Dict[str, Dict[str, Any]] = {}
-            for topo_node in topology:
-                primary_value = topo_node.get('primary')
-                if not primary_value:
-                    continue
-                topology_by_mac[str(primary_value).lower()] = topo_node
+            # 并发获取各种状态信息
+            system_status, mesh_info, connected_nodes, topology = self.client.get_all_status(self.device_name)
+            topology_by_mac = self._index_topology(topology)
             
             #TODO: connected_nodes中的node字典中没有nodeid字段，需要根据实际情况调整，
             #      nodeid需要从其他地方获取，例如拓扑结构中
             # 处理连接节点的信号质量
             self_id_value = mesh_info.get('nodeid') or mesh_info.get('primary') or mesh_info.get('node_mac') or mesh_info.get('device')
-            self_id = str(self_id_value).lower() if self_id_value else 'n/a'
+            self_id = _canon_mac(self_id_value) if self_id_value else 'n/a'
             self_entry = topology_by_mac.get(self_id)
             node_ip = (self_entry or {}).get('ipaddr') or mesh_info.get('ipaddr') or 'N/A'
             neighbors_data = self_entry.get('neighbors', []) if self_entry else []
             nodeinfo_list = []
-            throughput_samples = []
+            nodeinfo_by_mac: Dict[str, Dict[str, Any]] = {}
+            # 平均值只需要累加和与样本数，单次遍历中直接累加，不保留样本列表
+            rssi_sum = 0.0
+            snr_sum = 0.0
+            thr_sum = 0.0
+            thr_n = 0
             for node in connected_nodes:      # 这里只提供了mac地址和snr，rssi的对应关系
                 if not isinstance(node, dict):
                     continue
                 try:
                     primary_value = node.get('primary') or node.get('mac') or 'N/A'
-                    macaddr = str(primary_value).lower()
+                    macaddr = _canon_mac(primary_value)
                     rssi_raw = node.get('rssi', 0)
                     snr_raw = node.get('snr', 0)
                     rssi = float(rssi_raw) if rssi_raw is not None else 0.0
@@ -697,92 +1166,78 @@ class NexfiStatusLogger:
                         raw_assoc = raw_source
                     else:
                         raw_assoc = node
-                    node_entry = {
-                        'macaddr': macaddr,
-                        'rssi': rssi,
-                        'snr': snr,
-                        'raw': raw_assoc,
-                        'thr': raw_assoc.get('thr'),
-                        'mesh_plink': raw_assoc.get('mesh plink'),
-                        'mesh_llid': raw_assoc.get('mesh llid'),
-                        'mesh_plid': raw_assoc.get('mesh plid'),
-                        'mesh_local_ps': raw_assoc.get('mesh local PS'),
-                        'mesh_peer_ps': raw_assoc.get('mesh peer PS'),
-                        'mesh_non_peer_ps': raw_assoc.get('mesh non-peer PS'),
-                    }
+                    tx_info = raw_assoc.get('tx')
+                    rx_info = raw_assoc.get('rx')
+                    node_entry = NodeEntry(
+                        macaddr,
+                        rssi,
+                        snr,
+                        raw_assoc,
+                        **dict(_extract_assoc_fields(raw_assoc)),
+                        **dict(_extract_tx_fields(tx_info if isinstance(tx_info, dict) else {})),
+                        **dict(_extract_rx_fields(rx_info if isinstance(rx_info, dict) else {})),
+                    )
                     nodeinfo_list.append(node_entry)
-                    raw_info_candidate = node_entry.get('raw')
-                    raw_info: Dict[str, Any] = raw_info_candidate if isinstance(raw_info_candidate, dict) else {}
-                    thr_value = raw_info.get('thr')
+                    # 同一MAC出现多次时以第一条为准
+                    nodeinfo_by_mac.setdefault(macaddr, node_entry)
+                    rssi_sum += rssi
+                    snr_sum += snr
+                    thr_value = node_entry.thr
                     if isinstance(thr_value, (int, float)):
-                        throughput_samples.append(thr_value / 1000.0)
-
-                    tx_candidate = raw_info.get('tx')
-                    tx_info: Dict[str, Any] = tx_candidate if isinstance(tx_candidate, dict) else {}
-                    rx_candidate = raw_info.get('rx')
-                    rx_info: Dict[str, Any] = rx_candidate if isinstance(rx_candidate, dict) else {}
-                    node_entry['tx_packets'] = tx_info.get('packets')
-                    node_entry['tx_bytes'] = tx_info.get('bytes')
-                    node_entry['tx_retries'] = tx_info.get('retries')
-                    node_entry['tx_rate_curr'] = tx_info.get('rate')
-                    node_entry['rx_packets'] = rx_info.get('packets')
-                    node_entry['rx_bytes'] = rx_info.get('bytes')
-                    node_entry['rx_drop_misc'] = rx_info.get('drop_misc')
+                        thr_sum += thr_value / 1000.0
+                        thr_n += 1
                 except (ValueError, TypeError):
                     continue
 
             for node_entry in nodeinfo_list:
-                topo_entry = topology_by_mac.get(node_entry['macaddr'])
+                topo_entry = topology_by_mac.get(node_entry.macaddr)
                 if topo_entry:
-                    node_entry.setdefault('nodeid', topo_entry.get('nodeid'))
-                    node_entry.setdefault('ipaddr', topo_entry.get('ipaddr'))
+                    node_entry.nodeid = topo_entry.get('nodeid')
+                    node_entry.ipaddr = topo_entry.get('ipaddr')
 
-            avg_rssi = sum(node['rssi'] for node in nodeinfo_list) / len(nodeinfo_list) if nodeinfo_list else 0.0
-            avg_snr = sum(node['snr'] for node in nodeinfo_list) / len(nodeinfo_list) if nodeinfo_list else 0.0
+            node_n = len(nodeinfo_list)
+            avg_rssi = rssi_sum / node_n if node_n else 0.0
+            avg_snr = snr_sum / node_n if node_n else 0.0
             
             # 处理拓扑信息，计算平均链路质量
-            def _to_float(value: Any) -> Optional[float]:
-                try:
-                    if value in (None, ''):
-                        return None
-                    return float(value)
-                except (TypeError, ValueError):
-                    return None
-
-            link_qualities: List[float] = []
+            lq_sum = 0.0
+            lq_n = 0
 
             for neighbor in neighbors_data:
                 try:
-                    neighbor_mac = neighbor.get('neighbor', '').lower()
-                    matched_node = next((n for n in nodeinfo_list if n.get('macaddr') == neighbor_mac), None)
+                    neighbor_mac = _canon_mac(neighbor.get('neighbor', ''))
+                    matched_node = nodeinfo_by_mac.get(neighbor_mac)
                     if not matched_node:
                         continue
 
                     neighbor_node = topology_by_mac.get(neighbor_mac)
                     if neighbor_node:
-                        matched_node['nodeid'] = neighbor_node.get('nodeid') or matched_node.get('nodeid')
-                        matched_node['ipaddr'] = neighbor_node.get('ipaddr') or matched_node.get('ipaddr')
+                        matched_node.nodeid = neighbor_node.get('nodeid') or matched_node.nodeid
+                        matched_node.ipaddr = neighbor_node.get('ipaddr') or matched_node.ipaddr
 
-                    metric = _to_float(neighbor.get('metric'))
+                    metric, tx_rate, topology_snr = _neighbor_floats(neighbor)
                     if metric is not None and metric > 0:
-                        link_qualities.append(metric)
-                    matched_node['link_metric'] = metric
-                    matched_node['tx_rate'] = _to_float(neighbor.get('tx_rate'))
-                    matched_node['topology_snr'] = _to_float(neighbor.get('snr'))
-                    matched_node['last_seen'] = neighbor.get('last_seen')
+                        lq_sum += metric
+                        lq_n += 1
+                    matched_node.link_metric = metric
+                    matched_node.tx_rate = tx_rate
+                    matched_node.topology_snr = topology_snr
+                    matched_node.last_seen = neighbor.get('last_seen')
                 except Exception as e:
                     if self.verbose:
                         print(f"处理邻居节点时出错: {e}")
                     continue
             
-            avg_link_quality = sum(link_qualities) / len(link_qualities) if link_qualities else 0.0
+            avg_link_quality = lq_sum / lq_n if lq_n else 0.0
             
             connected_nodes_count = len(nodeinfo_list) if nodeinfo_list else len(connected_nodes)
             disabled_value = mesh_info.get('disabled', '1')
-            mesh_enabled = str(disabled_value).lower() in ('0', 'false')
+            if disabled_value.__class__ is not str:
+                disabled_value = str(disabled_value)
+            mesh_enabled = disabled_value.lower() in _MESH_ENABLED_VALUES
             throughput_value = system_status.get('throughput', 'N/A')
-            if (throughput_value in ('N/A', None, '')) and throughput_samples:
-                throughput_value = f"{sum(throughput_samples) / len(throughput_samples):.3f}"
+            if (throughput_value in ('N/A', None, '')) and thr_n:
+                throughput_value = f"{thr_sum / thr_n:.3f}"
 
             return {
                 'mesh_enabled': mesh_enabled,
@@ -815,127 +1270,89 @@ class NexfiStatusLogger:
                 'topology_nodes': len(topology),
                 'link_quality': avg_link_quality,
                 'nodeinfo_list': nodeinfo_list,
-                'typology': topology,
                 'avg_rssi': avg_rssi,
                 'avg_snr': avg_snr
-            }
+            }, topology
             
         except Exception as e:
             if self.verbose:
                 print(f"获取Nexfi数据时出错: {e}")
             raise
     
-    def log_nexfi_status(self):
-        """记录Nexfi状态数据到文件（使用Unix时间戳格式）"""
+    def log_nexfi_status(self, timestamp: Optional[float] = None):
+        """
+        记录Nexfi状态数据到文件（使用Unix时间戳格式）
+
+        timestamp 为本次采样节拍的时间戳，状态行和拓扑边行共用同一个值；未提供时取当前时间。
+        """
         try:
             # 获取时间戳（使用Unix时间戳，与UDP测试系统保持一致）
-            timestamp = time.time()
+            if timestamp is None:
+                timestamp = time.time()
             # 获取处理后的Nexfi数据
-            data = self.process_nexfi_data()
-            # 写入CSV文件，每个连接节点写一行
-            if data['nodeinfo_list']:
-                for node in data['nodeinfo_list']:
-                    self._status_csv.write_row([
-                        timestamp,                         # Unix时间戳
-                        data['mesh_enabled'],              # Mesh启用状态
-                        data['channel'],                   # 信道
-                        data['frequency_band'],            # 频宽
-                        data['tx_power'],                  # 发射功率
-                        data['work_mode'],                 # 工作模式
-                        data['node_id'],                   # 本节点ID
-                        data.get('node_ip', 'N/A'),        # 本节点IP
-                        data.get('wifi_quality', ''),
-                        data.get('wifi_quality_max', ''),
-                        data.get('wifi_noise', ''),
-                        data.get('wifi_bitrate', ''),
-                        data.get('wifi_mode', ''),
-                        data.get('channel_width', ''),
-                        data['connected_nodes'],           # 连接节点数
-                        node.get('nodeid', ''),            # 连接的节点ID
-                        node.get('macaddr', ''),           # 连接的节点MAC
-                        node.get('ipaddr', ''),            # 连接的节点IP
-                        node.get('rssi', ''),              # rssi
-                        node.get('snr', ''),               # snr
-                        node.get('topology_snr', ''),      # topo snr
-                        node.get('link_metric', ''),       # metric
-                        node.get('tx_rate', ''),           # tx rate
-                        node.get('last_seen', ''),         # last seen
-                        node.get('thr', ''),               # thr
-                        node.get('tx_packets', ''),
-                        node.get('tx_bytes', ''),
-                        node.get('tx_retries', ''),
-                        node.get('rx_packets', ''),
-                        node.get('rx_bytes', ''),
-                        node.get('rx_drop_misc', ''),
-                        node.get('mesh_plink', ''),
-                        node.get('mesh_llid', ''),
-                        node.get('mesh_plid', ''),
-                        node.get('mesh_local_ps', ''),
-                        node.get('mesh_peer_ps', ''),
-                        node.get('mesh_non_peer_ps', ''),
-                        data['throughput'],                # 吞吐量
-                        data['cpu_usage'],                 # CPU使用率
-                        data['memory_usage'],              # 内存使用率
-                        data.get('load1', ''),
-                        data.get('load5', ''),
-                        data.get('load15', ''),
-                        data.get('mem_total', ''),
-                        data.get('mem_free', ''),
-                        data.get('mem_cached', ''),
-                        data.get('bat_ipv4', ''),
-                        data.get('bat_ipv6', ''),
-                        data['uptime'],                    # 运行时间
-                        data['firmware_version'],          # 固件版本
-                        data['topology_nodes'],            # 拓扑节点数
-                        data['link_quality']               # 链路质量
+            data, topology_snapshot = self.process_nexfi_data()
+            # 各节点行共享的本节点/系统字段每个节拍只取一次，逐节点只取节点字段
+            prefix_values = (
+                data['mesh_enabled'],              # Mesh启用状态
+                data['channel'],                   # 信道
+                data['frequency_band'],            # 频宽
+                data['tx_power'],                  # 发射功率
+                data['work_mode'],                 # 工作模式
+                data['node_id'],                   # 本节点ID
+                data.get('node_ip', 'N/A'),        # 本节点IP
+                data.get('wifi_quality', ''),
+                data.get('wifi_quality_max', ''),
+                data.get('wifi_noise', ''),
+                data.get('wifi_bitrate', ''),
+                data.get('wifi_mode', ''),
+                data.get('channel_width', ''),
+                data['connected_nodes'],           # 连接节点数
+            )
+            suffix_values = (
+                data['throughput'],                # 吞吐量
+                data['cpu_usage'],                 # CPU使用率
+                data['memory_usage'],              # 内存使用率
+                data.get('load1', ''),
+                data.get('load5', ''),
+                data.get('load15', ''),
+                data.get('mem_total', ''),
+                data.get('mem_free', ''),
+                data.get('mem_cached', ''),
+                data.get('bat_ipv4', ''),
+                data.get('bat_ipv6', ''),
+                data['uptime'],                    # 运行时间
+                data['firmware_version'],          # 固件版本
+                data['topology_nodes'],            # 拓扑节点数
+                data['link_quality'],              # 链路质量
+            )
+            # 每个连接节点写一行；同一时刻的多行一次性批量写入
+            if self._csv_lines:
+                # 时间戳之后的本节点/Wi-Fi字段在稳定运行时基本不变，取值未变时复用上次格式化结果
+                if prefix_values != self._status_prefix_values:
+                    self._status_prefix_values = prefix_values
+                    self._status_prefix = ',' + _csv_join(prefix_values) + ','
+                prefix = _csv_field(timestamp) + self._status_prefix
+                suffix = ',' + _csv_join(suffix_values) + '\r\n'
+                if data['nodeinfo_list']:
+                    self._status_csv.write_lines([
+                        prefix + _csv_join(_node_row_values(node)) + suffix
+                        for node in data['nodeinfo_list']
                     ])
+                else:
+                    self._status_csv.write_lines([prefix + _EMPTY_NODE_COLUMNS + suffix])
             else:
-                self._status_csv.write_row([
-                    timestamp,
-                    data['mesh_enabled'],
-                    data['channel'],
-                    data['frequency_band'],
-                    data['tx_power'],
-                    data['work_mode'],
-                    data['node_id'],
-                    data.get('node_ip', 'N/A'),
-                    data.get('wifi_quality', ''),
-                    data.get('wifi_quality_max', ''),
-                    data.get('wifi_noise', ''),
-                    data.get('wifi_bitrate', ''),
-                    data.get('wifi_mode', ''),
-                    data.get('channel_width', ''),
-                    data['connected_nodes'],
-                    '', '', '',
-                    '', '', '',
-                    '', '', '',
-                    '', '', '',
-                    '', '', '',
-                    '', '', '',
-                    data['throughput'],
-                    data['cpu_usage'],
-                    data['memory_usage'],
-                    data.get('load1', ''),
-                    data.get('load5', ''),
-                    data.get('load15', ''),
-                    data.get('mem_total', ''),
-                    data.get('mem_free', ''),
-                    data.get('mem_cached', ''),
-                    data.get('bat_ipv4', ''),
-                    data.get('bat_ipv6', ''),
-                    data['uptime'],
-                    data['firmware_version'],
-                    data['topology_nodes'],
-                    data['link_quality']
-                ])
-            # 写拓扑数据到json文件
-            topology_snapshot = data.get('typology')
+                head = (timestamp,) + prefix_values
+                if data['nodeinfo_list']:
+                    self._status_csv.write_rows([
+                        head + _node_row_values(node) + suffix_values
+                        for node in data['nodeinfo_list']
+                    ])
+                else:
+                    self._status_csv.write_rows([head + _EMPTY_NODE_VALUES + suffix_values])
+            # 写拓扑边数据
             if topology_snapshot:
                 self.log_topology_edges(timestamp, topology_snapshot)
     
-            # 从data中移除typology，避免在CSV中显示
-            data.pop('typology', None)
-    
             # 显示当前数据（格式与UDP测试系统保持一致）
             if self.verbose:
                 print(
@@ -948,6 +1365,23 @@ class NexfiStatusLogger:
         except Exception as e:
             print(f"记录Nexfi状态数据时出错: {e}")
 
+    @staticmethod
+    def _edges_signature(topology: List[Dict[str, Any]]) -> Optional[Tuple[Any, ...]]:
+        """拓扑边的比较签名；last_seen 每次采样都会变化，不参与比较。结构异常时返回 None（照常写入）"""
+        try:
+            signature = []
+            for node in topology:
+                neighbors = node.get('neighbors', [])
+                if not isinstance(neighbors, list):
+                    continue
+                signature.append((node.get('primary'), tuple(
+                    (nb.get('neighbor'), nb.get('metric'), nb.get('snr'), nb.get('tx_rate'))
+                    for nb in neighbors
+                )))
+            return tuple(signature)
+        except (AttributeError, TypeError):
+            return None
+
     def log_topology_edges(self, timestamp: float, topology: List[Dict[str, Any]]):
         """把完整拓扑边写入CSV"""
         if not topology or self.topology_edges_disabled:
@@ -957,25 +1391,28 @@ class NexfiStatusLogger:
             if not self.topology_edges_initialized:
                 return
 
-        nodes_by_mac = {}
-        for node in topology:
-            primary = str(node.get('primary', '')).lower()
-            if not primary:
-                continue
-            nodes_by_mac[primary] = node
+        if self.topology_edges_dedup:
+            signature = self._edges_signature(topology)
+            if signature is not None and signature == self._last_edges_signature:
+                return
+            self._last_edges_signature = signature
 
+        # 与 process_nexfi_data 共用按 MAC 建立的拓扑索引，拓扑未变化时不重建
+        nodes_by_mac = self._index_topology(topology)
+
+        rows = []
         try:
             for node in topology:
-                router_mac = str(node.get('primary', '')).lower()
+                router_mac = _canon_mac(node.get('primary', ''))
                 router_ip = node.get('ipaddr', '')
                 router_nodeid = node.get('nodeid', '')
                 neighbors = node.get('neighbors', [])
                 if not isinstance(neighbors, list):
                     continue
                 for neighbor in neighbors:
-                    neighbor_mac = str(neighbor.get('neighbor', '')).lower()
+                    neighbor_mac = _canon_mac(neighbor.get('neighbor', ''))
                     neighbor_entry = nodes_by_mac.get(neighbor_mac, {})
-                    self._topology_edges_csv.write_row([
+                    rows.append((
                         timestamp,
                         router_mac,
                         router_ip,
@@ -987,10 +1424,15 @@ class NexfiStatusLogger:
                         neighbor.get('tx_rate', ''),
                         neighbor.get('snr', ''),
                         neighbor.get('last_seen', ''),
-                    ])
+                    ))
         except Exception as e:
             if self.verbose:
                 print(f"写入拓扑边数据失败: {e}")
+        # 一个拓扑快照的全部边一次性批量写入（出错前已整理好的边照常写入）
+        if self._csv_lines:
+            self._topology_edges_csv.write_lines([_csv_join(row) + '\r\n' for row in rows])
+        else:
+            self._topology_edges_csv.write_rows(rows)
 
         
     def run(self):
@@ -1000,19 +1442,33 @@ class NexfiStatusLogger:
             print(f"最长运行时间: {self.running_time}秒")
             print("按 Ctrl+C 停止记录\n")
         
-        # 计算结束时间
-        end_time = time.time() + self.running_time
+        # 计算结束时间；截止时间和采样节拍使用单调时钟
+        now = time.monotonic
+        stop = self._stop
+        end_time = now() + self.running_time
+        next_tick = now()
         
-        while self.running and time.time() < end_time:
+        while not stop.is_set() and now() < end_time:
             try:
-                self.log_nexfi_status()
-                time.sleep(self.log_interval)
+                # 每个节拍只取一次墙钟时间，同一节拍写出的所有行时间戳一致，便于下游按时间对齐
+                self.log_nexfi_status(time.time())
+                # 按固定节拍调度下一次采样，请求耗时不累积到采样周期中
+                next_tick += self.log_interval
+                current = now()
+                delay = next_tick - current
+                if delay > 0:
+                    # 等待不超过截止时间，到点即退出而不是再多等一个采样间隔
+                    stop.wait(min(delay, max(0.0, end_time - current)))
+                else:
+                    # 已落后于节拍(例如请求超时)，从当前时刻重新开始计时，不补采
+                    next_tick = now()
                 
             except KeyboardInterrupt:
                 break
             except Exception as e:
                 print(f"运行时错误: {e}")
-                time.sleep(1.0)
+                stop.wait(1.0)
+                next_tick = now()
         
         self.cleanup()
     
@@ -1023,6 +1479,7 @@ class NexfiStatusLogger:
             print(f"日志文件已保存: {self.log_file}")
         self._status_csv.close()
         self._topology_edges_csv.close()
+        self.client.close()
 
 
 def parse_args() -> Tuple[Dict[str, Any], argparse.Namespace]:
@@ -1046,6 +1503,12 @@ def parse_args() -> Tuple[Dict[str, Any], argparse.Namespace]:
                        help=f'batman-adv接口名称 (默认: {DEFAULT_CONFIG["bat_interface"]})')
     parser.add_argument('--verbose', type=str, default='true',
                        help='是否显示详细信息 (true/false)')
+    parser.add_argument('--flush-every', type=int, default=DEFAULT_CONFIG["csv_flush_every"],
+                       help=f'状态CSV每累计多少行刷新到磁盘 (默认: {DEFAULT_CONFIG["csv_flush_every"]})')
+    parser.add_argument('--log-format', choices=('csv', 'arrow'), default=DEFAULT_CONFIG["log_format"],
+                       help=f'日志格式: csv 或 arrow(Arrow IPC stream，需要 pyarrow) (默认: {DEFAULT_CONFIG["log_format"]})')
+    parser.add_argument('--dedup-topology-edges', action='store_true',
+                       help='拓扑边未变化时不重复写入 typology_edges CSV（读取时按时间向前填充）')
     parser.add_argument('--monitor', type=int, help='监控模式，指定刷新间隔（秒）')
     parser.add_argument('--save', action='store_true', help='保存信息到JSON文件')
     parser.add_argument('--output', help='输出文件名')
@@ -1063,6 +1526,9 @@ def parse_args() -> Tuple[Dict[str, Any], argparse.Namespace]:
         "device_name": args.device,
         "bat_interface": args.bat_interface,
         "verbose": args.verbose.lower() == 'true',
+        "csv_flush_every": args.flush_every,
+        "topology_edges_dedup": args.dedup_topology_edges,
+        "log_format": args.log_format,
     }
     
     return config, args
@@ -1086,10 +1552,10 @@ def main():
             print("按 Ctrl+C 退出")
             try:
                 while True:
-                    # 简化的状态显示
-                    system_status = client.get_system_status()
-                    mesh_info = client.get_mesh_info()
-                    connected_nodes = client.get_connected_nodes()
+                    # 简化的状态显示；各接口在一次批量请求中获取（不支持时并发请求），不显示拓扑故不请求
+                    system_status, mesh_info, connected_nodes, _ = client.get_all_status(
+                        config["device_name"], include_topology=False
+                    )
                     
                     print(f"\n=== {datetime.now().strftime('%H:%M:%S')} ===")
                     print(f"Mesh状态: {'启用' if mesh_info.get('disabled') == '0' else '禁用'}")
@@ -1100,6 +1566,8 @@ def main():
                     time.sleep(args.monitor)
             except KeyboardInterrupt:
                 print("\n监控已停止")
+            finally:
+                client.close()
         
         elif args.save:
             # 保存模式 - 保存当前状态到JSON
@@ -1110,15 +1578,19 @@ def main():
                 device_name=config["device_name"],
                 bat_interface=config["bat_interface"],
             )
+            system_status, mesh_info, connected_nodes, topology = client.get_all_status()
+            client.close()
+            # 快照时间只取一次，JSON 中的时间戳与默认文件名一致
+            snapshot_time = datetime.now()
             data = {
-                "timestamp": datetime.now().isoformat(),
-                "system_status": client.get_system_status(),
-                "mesh_info": client.get_mesh_info(),
-                "connected_nodes": client.get_connected_nodes(),
-                "network_topology": client.get_network_topology()
+                "timestamp": snapshot_time.isoformat(),
+                "system_status": system_status,
+                "mesh_info": mesh_info,
+                "connected_nodes": connected_nodes,
+                "network_topology": topology
             }
             
-            filename = args.output or f"nexfi_info_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+            filename = args.output or f"nexfi_info_{snapshot_time.strftime('%Y%m%d_%H%M%S')}.json"
             with open(filename, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
             print(f"信息已保存到: {filename}")
@@ -6,6 +6,7 @@
 1) 轻量检测文件是否被“原子保存/替换”(inode 变化)；变化后自动 reopen 并继续追加写入。
 2) 遇到 OSError（例如磁盘抖动、临时不可写）不永久禁用日志，而是退避重试 reopen。
 3) 控制 flush 频率，避免每行 flush 带来的性能开销，同时尽量降低数据丢失窗口。
+4) 文件句柄在两次 reopen 之间保持打开，可通过 buffering 指定更大的写缓冲区。
 """
 
 from __future__ import annotations
@@ -29,11 +30,12 @@ class ResilientCsvWriter:
         retry_base_interval_s: float = 5.0,
         retry_max_interval_s: float = 60.0,
         encoding: str = "utf-8",
+        buffering: int = -1,
         verbose: bool = False,
         label: str = "csv",
     ) -> None:
         self._path = path
-        self._header = list(header)
+        self._header = tuple(header)
         self._flush_every = max(1, int(flush_every))
         self._flush_interval_s = max(0.0, float(flush_interval_s))
         self._inode_check_every = max(1, int(inode_check_every))
@@ -41,6 +43,7 @@ class ResilientCsvWriter:
         self._retry_base_interval_s = max(0.1, float(retry_base_interval_s))
         self._retry_max_interval_s = max(self._retry_base_interval_s, float(retry_max_interval_s))
         self._encoding = encoding
+        self._buffering = int(buffering)
         self._verbose = bool(verbose)
         self._label = label
 
@@ -86,11 +89,59 @@ class ResilientCsvWriter:
         return True
 
     def write_rows(self, rows: Iterable[Sequence[Any]]) -> int:
-        written = 0
-        for row in rows:
-            if self.write_row(row):
-                written += 1
-        return written
+        """批量写入：整批只做一次打开/inode/flush 检查，并用一次 writerows 写出。"""
+        rows = rows if isinstance(rows, list) else list(rows)
+        if not rows:
+            return 0
+
+        now = time.time()
+        if not self._ensure_open(now):
+            return 0
+
+        if not self._ensure_inode_consistent(now, len(rows)):
+            return 0
+
+        try:
+            if self._writer is None:
+                return 0
+            self._writer.writerows(rows)
+            self._write_count += len(rows)
+            self._writes_since_flush += len(rows)
+        except (OSError, ValueError) as exc:
+            self._handle_io_error(exc, context="write")
+            return 0
+
+        self._maybe_flush(now)
+        return len(rows)
+
+    def write_lines(self, lines: Sequence[str]) -> int:
+        """
+        写入调用方已格式化好的 CSV 行（每行以 \r\n 结尾，与 csv.writer 默认行尾一致）。
+
+        打开/inode/flush 检查与 write_rows 相同，整批用一次 write 写出。
+        """
+        if not lines:
+            return 0
+
+        now = time.time()
+        if not self._ensure_open(now):
+            return 0
+
+        if not self._ensure_inode_consistent(now, len(lines)):
+            return 0
+
+        try:
+            if self._file is None:
+                return 0
+            self._file.write("".join(lines))
+            self._write_count += len(lines)
+            self._writes_since_flush += len(lines)
+        except (OSError, ValueError) as exc:
+            self._handle_io_error(exc, context="write")
+            return 0
+
+        self._maybe_flush(now)
+        return len(lines)
 
     def flush(self) -> None:
         if self._file is None:
@@ -126,7 +177,7 @@ class ResilientCsvWriter:
 
         try:
             os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
-            file_handle = open(self._path, "a", newline="", encoding=self._encoding)
+            file_handle = open(self._path, "a", newline="", encoding=self._encoding, buffering=self._buffering)
             writer = csv.writer(file_handle)
             # 新文件或被清空后重新创建时写入表头
             if file_handle.tell() == 0:
@@ -145,11 +196,11 @@ class ResilientCsvWriter:
             self._handle_io_error(exc, context="open")
             return False
 
-    def _ensure_inode_consistent(self, now: float) -> bool:
+    def _ensure_inode_consistent(self, now: float, count: int = 1) -> bool:
         if self._file is None:
             return False
 
-        self._writes_since_inode_check += 1
+        self._writes_since_inode_check += count
         should_check = self._writes_since_inode_check >= self._inode_check_every
         if not should_check and self._inode_check_interval_s > 0:
             should_check = (now - self._last_inode_check_at) >= self._inode_check_interval_s
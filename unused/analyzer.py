@@ -5,8 +5,169 @@ import pandas as pd
 import numpy as np
 import glob
 import json
+import csv
 import argparse
-from typing import Dict, List, Any, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from pyarrow import csv as pa_csv
+    from pyarrow import feather
+except ImportError:  # pyarrow 为可选依赖，缺失时回退到 pandas.read_csv
+    pa = None
+    pq = None
+    pa_csv = None
+    feather = None
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，缺失时使用 pandas / 标准库的 JSON 序列化
+    orjson = None
+
+try:
+    import polars as pl
+except ImportError:  # polars 为可选依赖，仅 --engine polars 时需要
+    pl = None
+
+# 设置环境变量 PYARROW_IO=0 可强制使用 pandas 解析CSV
+USE_PYARROW_IO = os.environ.get("PYARROW_IO", "1") != "0"
+# Arrow 多线程解析时每个数据块的大小
+ARROW_BLOCK_SIZE = 16 << 20
+# JSON 结果每次序列化的行数
+JSON_CHUNK_ROWS = 50_000
+# --minimal-columns 时发送/接收日志只读取丢包和延迟计算所需的列
+MINIMAL_COLUMNS = {
+    'df_sender': ('seq_num', 'timestamp'),
+    'df_receiver': ('seq_num', 'send_timestamp', 'recv_timestamp'),
+}
+
+
+def _read_csv_header(path: str) -> List[str]:
+    """
+    读取CSV表头
+    """
+    with open(path, newline='') as f:
+        return next(csv.reader(f), [])
+
+
+def _read_csv(path: str, usecols: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    读取CSV日志，优先使用 pyarrow 的多线程解析器，不可用时回退到 pandas.read_csv；
+    指定 usecols 时只解析其中存在于文件中的列
+    """
+    if pa_csv is None or not USE_PYARROW_IO:
+        wanted = None if usecols is None else set(usecols)
+        return pd.read_csv(
+            path,
+            usecols=None if wanted is None else (lambda col: col in wanted),
+        )
+
+    # 显式指定关键列类型，避免类型推断时重复扫描
+    convert_options = pa_csv.ConvertOptions(
+        column_types={
+            'timestamp': pa.float64(),
+            'seq_num': pa.int64(),
+            'send_timestamp': pa.float64(),
+            'recv_timestamp': pa.float64(),
+        },
+        include_columns=None if usecols is None else [
+            col for col in _read_csv_header(path) if col in usecols
+        ],
+    )
+    read_options = pa_csv.ReadOptions(use_threads=True, block_size=ARROW_BLOCK_SIZE)
+    table = pa_csv.read_csv(path, read_options=read_options, convert_options=convert_options)
+    return table.to_pandas(self_destruct=True)
+
+
+def _read_log(path: str, usecols: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """
+    按文件后缀读取日志：.parquet / .feather / .arrows(Arrow IPC stream) 走列式读取，其余按CSV处理；
+    指定 usecols 时只读取其中存在于文件中的列
+    """
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix in ('.parquet', '.feather', '.arrow', '.arrows'):
+        if pa is None:
+            raise ImportError(f"Reading {suffix} logs requires pyarrow: pip install pyarrow")
+        if suffix == '.parquet':
+            columns = None if usecols is None else [
+                col for col in pq.read_schema(path).names if col in usecols
+            ]
+            return pq.read_table(path, columns=columns).to_pandas(self_destruct=True)
+        if suffix in ('.feather', '.arrow'):
+            table = feather.read_table(path)
+        else:
+            with pa.ipc.open_stream(path) as reader:
+                table = reader.read_all()
+        if usecols is not None:
+            table = table.select([col for col in table.column_names if col in usecols])
+        return table.to_pandas(self_destruct=True)
+    return _read_csv(path, usecols)
+
+
+# 日志中的布尔状态列
+BOOL_COLUMNS = ('connected', 'armed', 'offboard')
+# 不同取值占比低于该比例的字符串列转换为 category
+CATEGORY_MAX_RATIO = 0.5
+
+
+def _optimize_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    压缩数据类型：整数列向下转换位宽，布尔状态列转为 bool，低基数字符串列转为 category
+    """
+    for col in df.select_dtypes(include='integer').columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    
+    for col in BOOL_COLUMNS:
+        if col in df.columns and df[col].dtype != bool and df[col].notna().all():
+            values = df[col].map({True: True, False: False, 'True': True, 'False': False})
+            if values.notna().all():
+                df[col] = values.astype(bool)
+    
+    for col in df.columns:
+        series = df[col]
+        if col in BOOL_COLUMNS or not pd.api.types.is_string_dtype(series) or len(series) == 0:
+            continue
+        if series.nunique() <= len(series) * CATEGORY_MAX_RATIO:
+            df[col] = series.astype('category')
+    return df
+
+
+def _asof_nearest_indices(left_ts: np.ndarray, right_ts: np.ndarray) -> np.ndarray:
+    """
+    为 left_ts 中每个时间戳找到升序数组 right_ts 中最近邻的下标(与 merge_asof direction='nearest' 一致，
+    距离相等时取较早的一条)；left_ts 为 NaN 或 right_ts 为空时返回 -1
+    """
+    n = len(right_ts)
+    if n == 0:
+        return np.full(len(left_ts), -1, dtype=np.intp)
+    pos = np.searchsorted(right_ts, left_ts, side='right')
+    backward = np.clip(pos - 1, 0, n - 1)
+    forward = np.clip(pos, 0, n - 1)
+    use_forward = (pos == 0) | (
+        (pos < n) & (np.abs(right_ts[forward] - left_ts) < np.abs(left_ts - right_ts[backward]))
+    )
+    idx = np.where(use_forward, forward, backward)
+    idx[np.isnan(left_ts)] = -1
+    return idx
+
+
+def _attach_nearest(merged_df: pd.DataFrame, right_df: pd.DataFrame, left_on: str, suffix: str) -> pd.DataFrame:
+    """
+    按 left_on 时间戳将 right_df 的最近邻记录按位置拼接到 merged_df，right_df 各列加上 suffix 后缀；
+    left_on 为 NaN 的行(如丢包)对应列填充 NaN。right_df 需已按 timestamp 升序排列且为默认整数索引
+    """
+    idx = _asof_nearest_indices(
+        merged_df[left_on].to_numpy(dtype=np.float64),
+        right_df['timestamp'].to_numpy(dtype=np.float64),
+    )
+    cols = [col for col in right_df.columns if col != 'timestamp']
+    # reindex 对 -1 下标产生缺失行，并自动提升 dtype 以容纳 NaN
+    matched = right_df[cols].reindex(idx)
+    matched.index = merged_df.index
+    matched.columns = [f"{col}{suffix}" for col in cols]
+    return pd.concat([merged_df, matched], axis=1)
 
 class UDPTestAnalyzer:
     """
@@ -22,7 +183,8 @@ class UDPTestAnalyzer:
         sender_comms_log: Optional[str] = None,
         receiver_comms_log: Optional[str] = None,
         output_path: str = "./analysis",
-        output_format: str = "csv"
+        output_format: str = "csv",
+        minimal_columns: bool = False
     ) -> None:
         """
         初始化分析器
@@ -35,6 +197,7 @@ class UDPTestAnalyzer:
             receiver_comms_log: 接收端通信模块日志文件路径(可选)
             output_path: 输出目录路径
             output_format: 输出格式(csv或json)
+            minimal_columns: 发送/接收日志只读取丢包和延迟计算所需的列，降低大日志的内存占用
         """
         self.sender_log = sender_log
         self.receiver_log = receiver_log
@@ -44,6 +207,7 @@ class UDPTestAnalyzer:
         self.receiver_comms_log = receiver_comms_log
         self.output_path = output_path
         self.output_format = output_format
+        self.minimal_columns = minimal_columns
         
         # 确保输出目录存在
         os.makedirs(output_path, exist_ok=True)
@@ -63,39 +227,95 @@ class UDPTestAnalyzer:
         """
         print("Loading data files...")
         
-        # 加载UDP发送日志
-        if os.path.exists(self.sender_log):
-            self.df_sender = pd.read_csv(self.sender_log)
-            print(f"Loaded sender log: {len(self.df_sender)} records")
+        # (属性名, 文件路径, 日志描述, 是否必需)
+        sources = [
+            ('df_sender', self.sender_log, 'sender log', True),
+            ('df_receiver', self.receiver_log, 'receiver log', True),
+            ('df_sender_gps', self.sender_gps_log, 'sender GPS log', False),
+            ('df_receiver_gps', self.receiver_gps_log, 'receiver GPS log', False),
+            ('df_sender_comms', self.sender_comms_log, 'sender comms log', False),
+            ('df_receiver_comms', self.receiver_comms_log, 'receiver comms log', False),
+        ]
+        
+        def _load(source: Tuple[str, Optional[str], str, bool]) -> Optional[pd.DataFrame]:
+            attr, path = source[0], source[1]
+            if path and os.path.exists(path):
+                usecols = MINIMAL_COLUMNS.get(attr) if self.minimal_columns else None
+                return _optimize_dtypes(_read_log(path, usecols))
+            return None
+        
+        # 各日志文件相互独立，并行读取以重叠磁盘I/O和解析
+        with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+            frames = list(executor.map(_load, sources))
+        
+        for (attr, path, label, required), df in zip(sources, frames):
+            if df is not None:
+                print(f"Loaded {label}: {len(df)} records")
+            elif required:
+                print(f"Warning: {label.capitalize()} file not found: {path}")
+                df = pd.DataFrame()
+            setattr(self, attr, df)
+    
+    def _report_packet_loss(self, sent_count: int, received_count: int, lost_count: int) -> float:
+        """
+        打印收发包数量并返回丢包率(百分比)
+        """
+        print(f"Total packets sent: {sent_count}")
+        print(f"Packets received: {received_count}")
+        print(f"Packets lost: {lost_count}")
+        
+        # 计算丢包率(未发送任何包时 lost_count 为0，丢包率为0)
+        packet_loss_rate = 100.0 * lost_count / max(1, sent_count)
+        print(f"Packet loss rate: {packet_loss_rate:.2f}%")
+        return packet_loss_rate
+    
+    def _report_delay_stats(self, delays: np.ndarray, packet_loss_rate: float) -> None:
+        """
+        根据延迟数组(丢包为NaN)计算统计信息，打印并保存到 statistics.json
+        """
+        # 过滤掉丢包行，各统计量直接在有效延迟数组上计算
+        delays = delays[~np.isnan(delays)]
+        if len(delays) > 0:
+            delay_stats = {
+                'min_delay': delays.min(),
+                'max_delay': delays.max(),
+                'avg_delay': delays.mean(),
+                'median_delay': np.median(delays),
+                # 与 pandas Series.std 保持一致，使用样本标准差
+                'std_delay': delays.std(ddof=1) if len(delays) > 1 else np.nan,
+                'packet_loss_rate': packet_loss_rate
+            }
+            print("\nDelay Statistics:")
+            print(f"Min delay: {delay_stats['min_delay']:.6f} seconds")
+            print(f"Max delay: {delay_stats['max_delay']:.6f} seconds")
+            print(f"Average delay: {delay_stats['avg_delay']:.6f} seconds")
+            print(f"Median delay: {delay_stats['median_delay']:.6f} seconds")
+            print(f"Standard deviation: {delay_stats['std_delay']:.6f} seconds")
         else:
-            print(f"Warning: Sender log file not found: {self.sender_log}")
-            self.df_sender = pd.DataFrame()
+            # 没有收到任何包：延迟统计量均为NaN，仍然保存丢包率
+            delay_stats = {
+                'min_delay': np.nan,
+                'max_delay': np.nan,
+                'avg_delay': np.nan,
+                'median_delay': np.nan,
+                'std_delay': np.nan,
+                'packet_loss_rate': packet_loss_rate
+            }
+            print("\nNo packets received, delay statistics unavailable")
         
-        # 加载UDP接收日志
-        if os.path.exists(self.receiver_log):
-            self.df_receiver = pd.read_csv(self.receiver_log)
-            print(f"Loaded receiver log: {len(self.df_receiver)} records")
+        # 保存统计信息(转换为 Python float，避免 numpy 标量的序列化问题)；
+        # NaN 统一写为 null、缩进统一为 2，保证两种序列化路径输出一致的标准 JSON
+        delay_stats = {
+            key: None if np.isnan(value) else float(value)
+            for key, value in delay_stats.items()
+        }
+        stats_file = os.path.join(self.output_path, 'statistics.json')
+        if orjson is not None:
+            with open(stats_file, 'wb') as f:
+                f.write(orjson.dumps(delay_stats, option=orjson.OPT_INDENT_2))
         else:
-            print(f"Warning: Receiver log file not found: {self.receiver_log}")
-            self.df_receiver = pd.DataFrame()
-        
-        # 加载GPS日志(如果存在)
-        if self.sender_gps_log and os.path.exists(self.sender_gps_log):
-            self.df_sender_gps = pd.read_csv(self.sender_gps_log)
-            print(f"Loaded sender GPS log: {len(self.df_sender_gps)} records")
-        
-        if self.receiver_gps_log and os.path.exists(self.receiver_gps_log):
-            self.df_receiver_gps = pd.read_csv(self.receiver_gps_log)
-            print(f"Loaded receiver GPS log: {len(self.df_receiver_gps)} records")
-        
-        # 加载通信模块日志(如果存在)
-        if self.sender_comms_log and os.path.exists(self.sender_comms_log):
-            self.df_sender_comms = pd.read_csv(self.sender_comms_log)
-            print(f"Loaded sender comms log: {len(self.df_sender_comms)} records")
-        
-        if self.receiver_comms_log and os.path.exists(self.receiver_comms_log):
-            self.df_receiver_comms = pd.read_csv(self.receiver_comms_log)
-            print(f"Loaded receiver comms log: {len(self.df_receiver_comms)} records")
+            with open(stats_file, 'w') as f:
+                json.dump(delay_stats, f, indent=2, allow_nan=False)
     
     def process_data(self) -> None:
         """
@@ -121,152 +341,65 @@ class UDPTestAnalyzer:
             print("Error: Receiver log missing required columns")
             return
         
-        # 创建所有发送包的完整序列
-        all_seq_nums = set(self.df_sender['seq_num'].unique())
-        received_seq_nums = set(self.df_receiver['seq_num'].unique())
-        lost_seq_nums = all_seq_nums - received_seq_nums
+        # GPS/通信模块日志只按时间戳排序一次，后续所有最近邻匹配直接复用
+        for attr in ('df_sender_gps', 'df_receiver_gps', 'df_sender_comms', 'df_receiver_comms'):
+            df = getattr(self, attr)
+            if df is not None and 'timestamp' in df.columns:
+                setattr(self, attr, df.sort_values('timestamp', kind='mergesort').reset_index(drop=True))
         
-        print(f"Total packets sent: {len(all_seq_nums)}")
-        print(f"Packets received: {len(received_seq_nums)}")
-        print(f"Packets lost: {len(lost_seq_nums)}")
+        # 在序列号数组上直接计算丢包，避免构造 Python 集合
+        sent_seq = self.df_sender['seq_num'].unique()
+        received_seq = self.df_receiver['seq_num'].unique()
+        lost_mask = ~np.isin(sent_seq, received_seq, assume_unique=True)
+        sent_count = len(sent_seq)
+        lost_count = int(lost_mask.sum())
         
-        # 计算丢包率
-        packet_loss_rate = len(lost_seq_nums) / len(all_seq_nums) * 100 if all_seq_nums else 0
-        print(f"Packet loss rate: {packet_loss_rate:.2f}%")
+        packet_loss_rate = self._report_packet_loss(sent_count, len(received_seq), lost_count)
         
         # 合并发送和接收日志
-        # 右连接以包含接收到的所有包
-        merged_df = pd.merge(
-            self.df_sender,
-            self.df_receiver,
-            on='seq_num',
-            how='outer',
-            suffixes=('_sender', '_receiver')
-        )
+        # 合并前显式重命名：两侧同名列分别加 _sender / _receiver 后缀，发送时间固定为 timestamp_sender
+        # (实际接收端日志没有 timestamp 列，依赖 suffixes 时发送端列名会保持为 timestamp)
+        overlap = (set(self.df_sender.columns) & set(self.df_receiver.columns)) - {'seq_num'}
+        sender_df = self.df_sender.rename(columns={col: f"{col}_sender" for col in overlap | {'timestamp'}})
+        receiver_df = self.df_receiver.rename(columns={col: f"{col}_receiver" for col in overlap})
+        # 以发送日志为基准左连接：每个已发送的包一行，未收到的即为丢包
+        merged_df = pd.merge(sender_df, receiver_df, on='seq_num', how='left')
         
         # 标记丢失的包
         merged_df['packet_lost'] = merged_df['recv_timestamp'].isna()
         
-        # 对于接收到的包，计算延迟
-        merged_df['delay'] = np.where(
-            merged_df['packet_lost'],
-            np.nan,
-            merged_df['recv_timestamp'] - merged_df['send_timestamp']
-        )
+        # 对于接收到的包，计算延迟(仅在接收行上做减法，丢包行保持NaN)
+        received_mask = ~merged_df['packet_lost'].to_numpy()
+        recv_ts = merged_df['recv_timestamp'].to_numpy(dtype=np.float64)
+        send_ts = merged_df['send_timestamp'].to_numpy(dtype=np.float64)
+        delay = np.full(len(merged_df), np.nan, dtype=np.float64)
+        delay[received_mask] = recv_ts[received_mask] - send_ts[received_mask]
+        merged_df['delay'] = delay
         
-        # 添加GPS数据(如果有)
-        if self.df_sender_gps is not None:
-            # 确保GPS数据有时间戳列
-            if 'timestamp' in self.df_sender_gps.columns:
-                # 使用最近邻匹配将GPS数据与发送时间关联
-                sender_gps_cols = [col for col in self.df_sender_gps.columns if col != 'timestamp']
-                merged_df = pd.merge_asof(
-                    merged_df.sort_values('timestamp_sender'),
-                    self.df_sender_gps.sort_values('timestamp'),
-                    left_on='timestamp_sender',
-                    right_on='timestamp',
-                    direction='nearest',
-                    suffixes=('', '_sender_gps')
-                )
-                
-                # 重命名GPS列以便区分
-                for col in sender_gps_cols:
-                    if col in merged_df.columns and f"{col}_sender_gps" not in merged_df.columns:
-                        merged_df.rename(columns={col: f"{col}_sender_gps"}, inplace=True)
-        
-        if self.df_receiver_gps is not None and not merged_df['packet_lost'].all():
-            # 确保GPS数据有时间戳列
-            if 'timestamp' in self.df_receiver_gps.columns:
-                # 使用最近邻匹配将GPS数据与接收时间关联
-                receiver_gps_cols = [col for col in self.df_receiver_gps.columns if col != 'timestamp']
-                # 只对接收到的包进行匹配
-                received_df = merged_df[~merged_df['packet_lost']].copy()
-                received_df = pd.merge_asof(
-                    received_df.sort_values('recv_timestamp'),
-                    self.df_receiver_gps.sort_values('timestamp'),
-                    left_on='recv_timestamp',
-                    right_on='timestamp',
-                    direction='nearest',
-                    suffixes=('', '_receiver_gps')
-                )
-                
-                # 重命名GPS列以便区分
-                for col in receiver_gps_cols:
-                    if col in received_df.columns and f"{col}_receiver_gps" not in received_df.columns:
-                        received_df.rename(columns={col: f"{col}_receiver_gps"}, inplace=True)
-                
-                # 合并回主数据框
-                merged_df = pd.merge(
-                    merged_df,
-                    received_df[['seq_num'] + [f"{col}_receiver_gps" for col in receiver_gps_cols if f"{col}_receiver_gps" in received_df.columns]],
-                    on='seq_num',
-                    how='left'
-                )
-        
-        # 添加通信模块数据(如果有)
-        if self.df_sender_comms is not None:
-            if 'timestamp' in self.df_sender_comms.columns:
-                sender_comms_cols = [col for col in self.df_sender_comms.columns if col != 'timestamp']
-                merged_df = pd.merge_asof(
-                    merged_df.sort_values('timestamp_sender'),
-                    self.df_sender_comms.sort_values('timestamp'),
-                    left_on='timestamp_sender',
-                    right_on='timestamp',
-                    direction='nearest',
-                    suffixes=('', '_sender_comms')
-                )
-                
-                for col in sender_comms_cols:
-                    if col in merged_df.columns and f"{col}_sender_comms" not in merged_df.columns:
-                        merged_df.rename(columns={col: f"{col}_sender_comms"}, inplace=True)
-        
-        if self.df_receiver_comms is not None and not merged_df['packet_lost'].all():
-            if 'timestamp' in self.df_receiver_comms.columns:
-                receiver_comms_cols = [col for col in self.df_receiver_comms.columns if col != 'timestamp']
-                received_df = merged_df[~merged_df['packet_lost']].copy()
-                received_df = pd.merge_asof(
-                    received_df.sort_values('recv_timestamp'),
-                    self.df_receiver_comms.sort_values('timestamp'),
-                    left_on='recv_timestamp',
-                    right_on='timestamp',
-                    direction='nearest',
-                    suffixes=('', '_receiver_comms')
-                )
-                
-                for col in receiver_comms_cols:
-                    if col in received_df.columns and f"{col}_receiver_comms" not in received_df.columns:
-                        received_df.rename(columns={col: f"{col}_receiver_comms"}, inplace=True)
-                
-                merged_df = pd.merge(
-                    merged_df,
-                    received_df[['seq_num'] + [f"{col}_receiver_comms" for col in receiver_comms_cols if f"{col}_receiver_comms" in received_df.columns]],
-                    on='seq_num',
-                    how='left'
-                )
+        # 全部丢包时没有延迟可统计，也无需关联GPS/通信模块数据，直接保存合并结果
+        if not received_mask.any():
+            self.df_merged = merged_df
+            self._report_delay_stats(delay, packet_loss_rate)
+            return
+        
+        # 按发送/接收时间最近邻匹配GPS和通信模块数据(searchsorted 按位置拼接，无需预先排序合并结果)
+        # 丢包行的recv_timestamp为NaN，接收端各列自动填充NaN
+        attachments = [
+            (self.df_sender_gps, 'timestamp_sender', '_sender_gps'),
+            (self.df_receiver_gps, 'recv_timestamp', '_receiver_gps'),
+            (self.df_sender_comms, 'timestamp_sender', '_sender_comms'),
+            (self.df_receiver_comms, 'recv_timestamp', '_receiver_comms'),
+        ]
+        for right_df, left_on, suffix in attachments:
+            # 确保GPS/通信模块数据有时间戳列
+            if right_df is not None and 'timestamp' in right_df.columns:
+                merged_df = _attach_nearest(merged_df, right_df, left_on, suffix)
         
         # 保存处理后的数据
         self.df_merged = merged_df
         
         # 计算统计信息
-        if not merged_df['delay'].isna().all():
-            delay_stats = {
-                'min_delay': merged_df['delay'].min(),
-                'max_delay': merged_df['delay'].max(),
-                'avg_delay': merged_df['delay'].mean(),
-                'median_delay': merged_df['delay'].median(),
-                'std_delay': merged_df['delay'].std(),
-                'packet_loss_rate': packet_loss_rate
-            }
-            print("\nDelay Statistics:")
-            print(f"Min delay: {delay_stats['min_delay']:.6f} seconds")
-            print(f"Max delay: {delay_stats['max_delay']:.6f} seconds")
-            print(f"Average delay: {delay_stats['avg_delay']:.6f} seconds")
-            print(f"Median delay: {delay_stats['median_delay']:.6f} seconds")
-            print(f"Standard deviation: {delay_stats['std_delay']:.6f} seconds")
-            
-            # 保存统计信息
-            with open(os.path.join(self.output_path, 'statistics.json'), 'w') as f:
-                json.dump(delay_stats, f, indent=4)
+        self._report_delay_stats(delay, packet_loss_rate)
     
     def save_results(self) -> None:
         """
@@ -290,9 +423,21 @@ class UDPTestAnalyzer:
         
         elif self.output_format.lower() == 'json':
             json_file = f"{output_file}.json"
-            # 将数据转换为JSON格式(每行一个记录)
-            with open(json_file, 'w') as f:
-                f.write(self.df_merged.to_json(orient='records', lines=True))
+            # 将数据转换为JSON格式(每行一个记录)，分块写出避免整体JSON字符串占用内存
+            with open(json_file, 'wb') as f:
+                for start in range(0, len(self.df_merged), JSON_CHUNK_ROWS):
+                    chunk = self.df_merged.iloc[start:start + JSON_CHUNK_ROWS]
+                    if orjson is not None:
+                        f.write(b'\n'.join(
+                            orjson.dumps(record, option=orjson.OPT_SERIALIZE_NUMPY)
+                            for record in chunk.to_dict('records')
+                        ))
+                        f.write(b'\n')
+                    else:
+                        text = chunk.to_json(orient='records', lines=True)
+                        f.write(text.encode('utf-8'))
+                        if not text.endswith('\n'):
+                            f.write(b'\n')
             print(f"Results saved to {json_file}")
         
         else:
@@ -308,6 +453,173 @@ class UDPTestAnalyzer:
         print("\nAnalysis completed")
 
 
+def _scan_log(path: str) -> "pl.LazyFrame":
+    """
+    按文件后缀惰性扫描日志(polars)，与 _read_log 支持的格式一致
+    """
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix == '.parquet':
+        return pl.scan_parquet(path)
+    if suffix in ('.feather', '.arrow'):
+        return pl.scan_ipc(path)
+    if suffix == '.arrows':
+        return pl.read_ipc_stream(path).lazy()
+    # 与 _read_csv 一致，显式指定关键列类型
+    return pl.scan_csv(path, schema_overrides={
+        'timestamp': pl.Float64,
+        'seq_num': pl.Int64,
+        'send_timestamp': pl.Float64,
+        'recv_timestamp': pl.Float64,
+    })
+
+
+def _collect(lf: "pl.LazyFrame") -> "pl.DataFrame":
+    """
+    使用流式引擎执行查询，旧版 polars 不支持 engine 参数时回退到 streaming=True
+    """
+    try:
+        return lf.collect(engine='streaming')
+    except TypeError:
+        return lf.collect(streaming=True)
+
+
+class PolarsUDPTestAnalyzer(UDPTestAnalyzer):
+    """
+    基于 polars 的分析器，与 UDPTestAnalyzer 接口和输出一致。
+    日志以 LazyFrame 形式扫描，合并、丢包标记、延迟计算和 GPS/通信模块最近邻匹配
+    组成一个查询计划，由 polars 优化后一次执行；结果转换为 pandas 后沿用原有的保存逻辑。
+    注意：最近邻匹配距离相等时 polars 取较晚的一条，pandas 引擎取较早的一条。
+    """
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        if pl is None:
+            raise ImportError("The polars engine requires polars: pip install polars")
+        super().__init__(*args, **kwargs)
+    
+    def load_data(self) -> None:
+        """
+        惰性扫描所有日志文件，实际读取推迟到 process_data 执行查询时
+        """
+        print("Scanning data files...")
+        
+        sources = [
+            ('df_sender', self.sender_log, 'sender log', True),
+            ('df_receiver', self.receiver_log, 'receiver log', True),
+            ('df_sender_gps', self.sender_gps_log, 'sender GPS log', False),
+            ('df_receiver_gps', self.receiver_gps_log, 'receiver GPS log', False),
+            ('df_sender_comms', self.sender_comms_log, 'sender comms log', False),
+            ('df_receiver_comms', self.receiver_comms_log, 'receiver comms log', False),
+        ]
+        
+        for attr, path, label, required in sources:
+            lf = None
+            if path and os.path.exists(path):
+                lf = _scan_log(path)
+                if self.minimal_columns and attr in MINIMAL_COLUMNS:
+                    lf = lf.select([col for col in lf.collect_schema().names() if col in MINIMAL_COLUMNS[attr]])
+                print(f"Scanned {label}: {path}")
+            elif required:
+                print(f"Warning: {label.capitalize()} file not found: {path}")
+                lf = pl.LazyFrame()
+            setattr(self, attr, lf)
+    
+    def _attach_nearest_lazy(self, merged: "pl.LazyFrame", right: "pl.LazyFrame", left_on: str, suffix: str) -> "pl.LazyFrame":
+        """
+        按 left_on 时间戳最近邻匹配 right 的记录，right 各列加上 suffix 后缀；merged 需已按 left_on 排序
+        """
+        cols = [col for col in right.collect_schema().names() if col != 'timestamp']
+        right = right.sort('timestamp').rename({col: f"{col}{suffix}" for col in cols})
+        right = right.rename({'timestamp': '_asof_timestamp'})
+        return merged.join_asof(
+            right,
+            left_on=left_on,
+            right_on='_asof_timestamp',
+            strategy='nearest'
+        ).drop('_asof_timestamp')
+    
+    def process_data(self) -> None:
+        """
+        处理数据，步骤与 UDPTestAnalyzer.process_data 相同
+        """
+        sender_cols = self.df_sender.collect_schema().names()
+        receiver_cols = self.df_receiver.collect_schema().names()
+        if not sender_cols or not receiver_cols:
+            print("Error: Cannot process data without sender and receiver logs")
+            return
+        
+        print("Processing data...")
+        
+        if 'timestamp' not in sender_cols:
+            print("Error: Sender log missing 'timestamp' column")
+            return
+        
+        if 'seq_num' not in receiver_cols or 'send_timestamp' not in receiver_cols:
+            print("Error: Receiver log missing required columns")
+            return
+        
+        def _usable(lf: Optional["pl.LazyFrame"]) -> bool:
+            return lf is not None and 'timestamp' in lf.collect_schema().names()
+        
+        # 丢包统计：接收端序列号只有一列，先物化后供 is_in 使用
+        received_seq = self.df_receiver.select(pl.col('seq_num').unique()).collect().to_series()
+        counts = self.df_sender.select(
+            pl.col('seq_num').n_unique().alias('sent'),
+            (~pl.col('seq_num').unique().is_in(received_seq.implode())).sum().alias('lost'),
+        ).collect()
+        sent_count = int(counts['sent'][0])
+        lost_count = int(counts['lost'][0])
+        packet_loss_rate = self._report_packet_loss(sent_count, len(received_seq), lost_count)
+        
+        # 与 pandas 引擎列名一致：两侧同名列分别加上 _sender / _receiver 后缀，发送时间固定为 timestamp_sender
+        overlap = (set(sender_cols) & set(receiver_cols)) - {'seq_num'}
+        merged = self.df_sender.rename({col: f"{col}_sender" for col in overlap | {'timestamp'}}).join(
+            self.df_receiver.rename({col: f"{col}_receiver" for col in overlap}),
+            on='seq_num',
+            how='left',
+            maintain_order='left'
+        )
+        
+        recv_ts = pl.col('recv_timestamp').fill_nan(None)
+        merged = merged.with_columns(
+            recv_ts.is_null().alias('packet_lost'),
+            pl.when(recv_ts.is_not_null())
+            .then(pl.col('recv_timestamp') - pl.col('send_timestamp'))
+            .alias('delay'),
+        )
+        
+        # 最近邻匹配需要按匹配键排序，匹配完成后按行号恢复发送日志顺序，与 pandas 引擎一致
+        attachments = [
+            (self.df_sender_gps, 'timestamp_sender', '_sender_gps'),
+            (self.df_receiver_gps, 'recv_timestamp', '_receiver_gps'),
+            (self.df_sender_comms, 'timestamp_sender', '_sender_comms'),
+            (self.df_receiver_comms, 'recv_timestamp', '_receiver_comms'),
+        ]
+        # 全部丢包时跳过所有匹配，与 pandas 引擎一致
+        attachments = [item for item in attachments if _usable(item[0])] if lost_count < sent_count else []
+        if attachments:
+            # 匹配结果的列按上面的顺序排列，与 pandas 引擎一致
+            columns = merged.collect_schema().names() + [
+                f"{col}{suffix}"
+                for lf, _, suffix in attachments
+                for col in lf.collect_schema().names() if col != 'timestamp'
+            ]
+            merged = merged.with_row_index('_row')
+            sorted_by = None
+            # 同一匹配键的关联连续执行，每个匹配键只排序一次
+            for lf, left_on, suffix in sorted(attachments, key=lambda item: item[1] != 'timestamp_sender'):
+                if left_on != sorted_by:
+                    # 丢包行的接收时间为空，排在最后且不参与匹配
+                    merged = merged.sort(left_on, nulls_last=True, maintain_order=True)
+                    sorted_by = left_on
+                merged = self._attach_nearest_lazy(merged, lf, left_on, suffix)
+            merged = merged.sort('_row').select(columns)
+        
+        # 整个查询计划只在这里执行一次，结果转为 pandas 供保存和后续使用
+        result = _collect(merged)
+        self.df_merged = result.to_pandas()
+        
+        self._report_delay_stats(result['delay'].to_numpy().astype(np.float64), packet_loss_rate)
+
+
 def parse_args() -> argparse.Namespace:
     """
     解析命令行参数
@@ -330,6 +642,10 @@ def parse_args() -> argparse.Namespace:
                         help='Output directory path')
     parser.add_argument('--output-format', choices=['csv', 'json'], default='csv', 
                         help='Output file format')
+    parser.add_argument('--engine', choices=['pandas', 'polars'], default='pandas', 
+                        help='Data processing engine (polars must be installed separately)')
+    parser.add_argument('--minimal-columns', action='store_true', 
+                        help='Only load the sender/receiver columns needed for loss and delay statistics')
     
     return parser.parse_args()
 
@@ -337,7 +653,8 @@ def parse_args() -> argparse.Namespace:
 if __name__ == "__main__":
     args = parse_args()
     
-    analyzer = UDPTestAnalyzer(
+    analyzer_cls = PolarsUDPTestAnalyzer if args.engine == 'polars' else UDPTestAnalyzer
+    analyzer = analyzer_cls(
         sender_log=args.sender_log,
         receiver_log=args.receiver_log,
         sender_gps_log=args.sender_gps,
@@ -345,7 +662,8 @@ if __name__ == "__main__":
         sender_comms_log=args.sender_comms,
         receiver_comms_log=args.receiver_comms,
         output_path=args.output_path,
-        output_format=args.output_format
+        output_format=args.output_format,
+        minimal_columns=args.minimal_columns
     )
     
     analyzer.analyze() 
\ No newline at end of file
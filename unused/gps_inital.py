@@ -12,6 +12,9 @@ import sys
 from datetime import datetime
 from as2_python_api.drone_interface_gps import DroneInterfaceGPS
 
+# 每写入多少行 flush 一次CSV文件
+CSV_FLUSH_EVERY = 20
+
 
 class GPSLogger:
     """GPS数据记录器类"""
@@ -55,15 +58,17 @@ class GPSLogger:
         self.running = False
         
     def init_csv_file(self):
-        """初始化CSV文件，写入表头"""
+        """初始化CSV文件，写入表头；文件句柄和 csv.writer 常驻，记录时直接复用"""
         try:
-            with open(self.log_file, 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow([
-                    'timestamp', 'latitude', 'longitude', 'altitude',
-                    'local_x', 'local_y', 'local_z',
-                    'connected', 'armed', 'offboard'
-                ])
+            self._csv_fh = open(self.log_file, 'w', newline='', buffering=1 << 16)
+            self._csv_writer = csv.writer(self._csv_fh)
+            self._csv_writer.writerow([
+                'timestamp', 'latitude', 'longitude', 'altitude',
+                'local_x', 'local_y', 'local_z',
+                'connected', 'armed', 'offboard'
+            ])
+            self._csv_fh.flush()
+            self._rows_since_flush = 0
             print(f"GPS数据将记录到: {self.log_file}")
         except Exception as e:
             print(f"创建CSV文件时出错: {e}")
@@ -89,14 +94,16 @@ class GPSLogger:
             armed = info.get('armed', False)
             offboard = info.get('offboard', False)
             
-            # 写入CSV文件
-            with open(self.log_file, 'a', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow([
-                    timestamp, lat, lon, alt,
-                    x, y, z,
-                    connected, armed, offboard
-                ])
+            # 写入CSV文件，每 CSV_FLUSH_EVERY 行 flush 一次，限制异常退出时丢失的数据量
+            self._csv_writer.writerow([
+                timestamp, lat, lon, alt,
+                x, y, z,
+                connected, armed, offboard
+            ])
+            self._rows_since_flush += 1
+            if self._rows_since_flush >= CSV_FLUSH_EVERY:
+                self._csv_fh.flush()
+                self._rows_since_flush = 0
                 
             # 显示当前数据
             print(f"{timestamp}: GPS({lat:.6f}, {lon:.6f}, {alt:.2f}m) "
@@ -131,6 +138,8 @@ class GPSLogger:
         
     def cleanup(self):
         """清理资源"""
+        if not self._csv_fh.closed:
+            self._csv_fh.close()
         print(f"\nGPS数据已保存到: {self.log_file}")
         try:
             self.drone.shutdown()
@@ -39,10 +39,13 @@ class GPSLogger:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         self.log_file = os.path.join(self.log_path, f"gps_log_{timestamp}.csv")
         
-        # 初始化日志
-        with open(self.log_file, 'w', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow(["timestamp", "latitude", "longitude", "altitude", "speed", "heading"])
+        # 初始化日志：文件句柄常驻，避免每次记录都 open/close
+        self._csv_fh = open(self.log_file, 'w', newline='')
+        self._writer = csv.writer(self._csv_fh)
+        self._writer.writerow(["timestamp", "latitude", "longitude", "altitude", "speed", "heading"])
+        self._csv_fh.flush()
+        self._flush_every = 10
+        self._rows_since_flush = 0
         
         # 停止标志
         self.stop_flag = threading.Event()
@@ -79,17 +82,19 @@ class GPSLogger:
         current_time = time.time()
         gps_data = self.get_gps_data()
         
-        # 记录到日志
-        with open(self.log_file, 'a', newline='') as f:
-            writer = csv.writer(f)
-            writer.writerow([
-                current_time,
-                gps_data.get("latitude", 0.0),
-                gps_data.get("longitude", 0.0),
-                gps_data.get("altitude", 0.0),
-                gps_data.get("speed", 0.0),
-                gps_data.get("heading", 0.0)
-            ])
+        # 记录到日志，每 K 行 flush 一次
+        self._writer.writerow([
+            current_time,
+            gps_data.get("latitude", 0.0),
+            gps_data.get("longitude", 0.0),
+            gps_data.get("altitude", 0.0),
+            gps_data.get("speed", 0.0),
+            gps_data.get("heading", 0.0)
+        ])
+        self._rows_since_flush += 1
+        if self._rows_since_flush >= self._flush_every:
+            self._csv_fh.flush()
+            self._rows_since_flush = 0
         
         # 打印信息
         if self.verbose:
@@ -129,6 +134,14 @@ class GPSLogger:
             print("\nGPS logging interrupted by user.")
         finally:
             self.stop_flag.set()
+            self.close()
+    
+    def close(self) -> None:
+        """
+        关闭日志文件
+        """
+        if not self._csv_fh.closed:
+            self._csv_fh.close()
     
     def stop(self) -> None:
         """